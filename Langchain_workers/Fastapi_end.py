@@ -8,17 +8,18 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_openai import ChatOpenAI
 from langchain_core.tools import tool
 from langchain.chains import RetrievalQA
-from openai import OpenAI
 import os
 from langchain.agents import initialize_agent, AgentType
 import os
 from langchain.tools import Tool
 from langchain.schema import Document
-from typing import Optional
+from typing import Optional, List
 import uuid
-from Langchain_workers.shared_transcription_rag import shared_state
+from Langchain_workers.shared_transcription_rag import shared_state, DEFAULT_STREAM
 import shutil
 from dotenv import load_dotenv
+from llm_stream import stream_completion
+from client_pool import client_pool
 
 app=FastAPI()
 load_dotenv()
@@ -27,7 +28,7 @@ CHROMA_PATH = "./chroma_store"
 RESULTS = {}
 AZURE_KEY =  os.getenv("AZURE_KEY")
 AZURE_REGION = os.getenv("AZURE_REGION")           
-AUDIO_FILE = "conversation.wav"
+AUDIO_FILE = "conversation.flac"
 vectordb = None
 
 def delete_chroma_next_start():
@@ -49,9 +50,35 @@ class TranscriptionUpdate(BaseModel):
 def update_transcription(req: TranscriptionUpdate):
     shared_state.set_transcription(req.new_text)
     return {"status": "ok"}
+
+class TranscriptSegment(BaseModel):
+    seq: int
+    text: str
+
+class TranscriptionAppend(BaseModel):
+    stream: str = DEFAULT_STREAM
+    session: str
+    segments: List[TranscriptSegment]
+
+@app.post("/append_transcription")
+def append_transcription(req: TranscriptionAppend):
+    next_seq = shared_state.append(req.stream, req.session, [(s.seq, s.text) for s in req.segments])
+    return {"status": "ok", "next_seq": next_seq}
+
+class ActiveStream(BaseModel):
+    stream: str = DEFAULT_STREAM
+
+@app.post("/active_stream")
+def set_active_stream(req: ActiveStream):
+    shared_state.set_active(req.stream)
+    return {"status": "ok", "stream": shared_state.active}
+
 @app.get("/get_transcription")
-def get_transcription():
-    return {"transcription": shared_state.get_transcription()}
+def get_transcription(stream: Optional[str] = None, since: Optional[int] = None, session: Optional[str] = None):
+    if since is None:
+        return {"transcription": shared_state.get_transcription(stream)}
+    stream, current, next_seq, texts, resync = shared_state.read(stream, since, session)
+    return {"stream": stream, "session": current, "next_seq": next_seq, "segments": texts, "resync": resync}
 
 # ----------------- REQUEST MODEL ----------------- #
 class QueryRequest(BaseModel):
@@ -202,17 +229,23 @@ def make_vector_db(req: FileRequest, background_tasks: BackgroundTasks):
 TRANSCRIPTS = {}
 
 
-summary_tasks = {}  # task_id: {"status": "Pending/Completed", "summary": str}
+summary_tasks = {}  # task_id: {"status": "Pending/Completed", "summary": str, "partial": str}
 
 # Simulated background summary function
 def generate_summary(task_id: str,diarized:str,language:str,prompt:str,gpt_model:str):
     """Simulate time-consuming summary generation"""
     
 
-    # Set your API key
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))  # or just assign your key as a string
+    client = client_pool.get("openai")
     # Call ChatGPT
-    response = client.chat.completions.create(
+    # Stream the reply; pollers see the text so far in "partial"
+    def on_partial(text):
+        summary_tasks[task_id]["partial"] = text
+
+    reply = stream_completion(
+        client,
+        on_partial,
+        min_interval=0.2,
         model=gpt_model,
         messages=[
             {"role": "system", "content": f"You have to summarize the paragrpah which will be provided to you as meeting of meetings in the following language:{language}"},
@@ -221,10 +254,8 @@ def generate_summary(task_id: str,diarized:str,language:str,prompt:str,gpt_model
         #max_tokens=300
     )
 
-    # Extract the reply
-    reply = response.choices[0].message.content
-
     summary_tasks[task_id]["summary"] = reply
+    summary_tasks[task_id]["partial"] = reply
     summary_tasks[task_id]["status"] = "Completed"
 class summary_trans(BaseModel):
     diarized:str
@@ -235,7 +266,7 @@ class summary_trans(BaseModel):
 @app.post("/start_summary")
 async def start_summary(background_tasks: BackgroundTasks,sum:summary_trans):
     task_id = str(uuid.uuid4())
-    summary_tasks[task_id] = {"status": "Pending", "summary": None}
+    summary_tasks[task_id] = {"status": "Pending", "summary": None, "partial": ""}
 
 
     # Run summary in background
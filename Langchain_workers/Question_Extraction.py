@@ -1,9 +1,46 @@
 import json
-from PyQt5.QtCore import QThread, pyqtSignal
-from openai import OpenAI
-import requests, os
+from PyQt5.QtCore import QObject, pyqtSignal
+import requests
+import threading
+from client_pool import client_pool
+import llm_stream  # noqa: F401  registers the shared "openai" client
 
-class Question_extraction_worker(QThread):
+client_pool.register("backend_http", requests.Session)
+
+# local copy of the backend transcript, topped up with "since" reads
+_transcript = {"stream": None, "session": None, "next_seq": 0, "segments": []}
+_transcript_lock = threading.Lock()
+
+
+def fetch_transcription(timeout=6):
+    """Return the active transcript, fetching only segments added since the last call."""
+    with _transcript_lock:
+        for _ in range(2):
+            resp = client_pool.get("backend_http").get(
+                "http://127.0.0.1:8000/get_transcription",
+                params={"since": _transcript["next_seq"], "session": _transcript["session"] or ""},
+                timeout=timeout,
+            )
+            resp.raise_for_status()
+            data = resp.json() if resp.content else {}
+            if "segments" not in data:
+                return data.get("transcription", "")  # backend without delta reads
+            changed = data.get("stream") != _transcript["stream"]
+            if changed and _transcript["next_seq"] and not data.get("resync"):
+                # the active stream changed (Window 5 toggled): read the new one from the start
+                _transcript.update(stream=data.get("stream"), session=None, next_seq=0, segments=[])
+                continue
+            if data.get("resync"):
+                _transcript["segments"] = []  # backend restarted or we were ahead
+            _transcript["segments"].extend(data["segments"])
+            _transcript["stream"] = data.get("stream")
+            _transcript["session"] = data.get("session")
+            _transcript["next_seq"] = data["next_seq"]
+            break
+        return " ".join(_transcript["segments"])
+
+
+class Question_extraction_worker(QObject):
     # emit a list of questions OR a single error marker string in the list
     text_ready = pyqtSignal(list)
 
@@ -15,10 +52,7 @@ class Question_extraction_worker(QThread):
     def run(self):
         try:
             # small timeout so thread doesn't hang forever
-            resp = requests.get("http://127.0.0.1:8000/get_transcription", timeout=6)
-            resp.raise_for_status()
-            data = resp.json() if resp.content else {}
-            transcription = data.get("transcription", "")
+            transcription = fetch_transcription(timeout=6)
 
             # If transcription is missing/empty -> emit structured error and stop
             if not transcription or not str(transcription).strip():
@@ -36,7 +70,7 @@ class Question_extraction_worker(QThread):
 
         # --- Only proceed to call OpenAI if we have a non-empty transcription ---
         try:
-            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            client = client_pool.get("openai")
             response = client.chat.completions.create(
             model=self.gpt_model,
             temperature=0,         # deterministic responses
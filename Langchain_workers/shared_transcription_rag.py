@@ -1,21 +1,76 @@
 # shared_state.py
 from threading import Lock
+from transcript_store import TranscriptChannel
+
+DEFAULT_STREAM = "window4"  # active stream until the client names another
+
 
 class SharedState:
+    """Backend copy of the GUI's transcript channels, kept in sync by appends.
+
+    Each stream belongs to a client ``session``; segments carry the seq the
+    client assigned, so a retried post is ignored and a post that skips
+    ahead is refused until the client resends from ``next_seq``. Readers
+    that don't name a stream get the ``active`` one: the client switches it
+    to Window 5's polished text while that window is on.
+    """
+
     def __init__(self):
         self._lock = Lock()
-        self._transcription = ""
+        self._streams = {}   # stream -> TranscriptChannel
+        self._sessions = {}  # stream -> client session id
+        self.active = DEFAULT_STREAM
+
+    def set_active(self, stream):
+        with self._lock:
+            self.active = stream or DEFAULT_STREAM
+
+    def _channel(self, stream):
+        channel = self._streams.get(stream)
+        if channel is None:
+            channel = self._streams[stream] = TranscriptChannel(stream)
+        return channel
 
-    def set_transcription(self, text: str):
+    def append(self, stream, session, segments):
+        """Append ``(seq, text)`` pairs in order; returns the next seq expected."""
         with self._lock:
-            print(f"[SharedState] set_transcription: '{self._transcription}'")
-            self._transcription = text.strip()
+            if self._sessions.get(stream) != session:
+                self._sessions[stream] = session  # new client run: start over
+                self._streams[stream] = TranscriptChannel(stream)
+            channel = self._channel(stream)
+            for seq, text in segments:
+                if seq < channel.version:
+                    continue  # already have it (retried post)
+                if seq > channel.version:
+                    print(f"[SharedState] {stream}: gap at {channel.version}, got {seq}")
+                    break
+                channel.append(text)
+            return channel.version
 
-    def get_transcription(self) -> str:
+    def read(self, stream=None, since=0, session=None):
+        """``(stream, session, next_seq, texts, resync)``; resync means ``texts`` start at 0."""
         with self._lock:
-            print(f"[SharedState] get_transcription returning: '{self._transcription}'")
+            stream = stream or self.active
+            channel = self._channel(stream)
+            current = self._sessions.get(stream)
+            resync = since > channel.version or (since > 0 and (session or None) != current)
+            segments = channel.since(0 if resync else since)
+            return stream, current, channel.version, [s.text for s in segments], resync
 
-            return self._transcription
+    def set_transcription(self, text: str, stream=DEFAULT_STREAM):
+        with self._lock:
+            print(f"[SharedState] set_transcription: {len(text)} chars")
+            self._sessions[stream] = None
+            self._streams[stream] = TranscriptChannel(stream)
+            if text.strip():
+                self._streams[stream].append(text.strip())
+
+    def get_transcription(self, stream=None) -> str:
+        with self._lock:
+            channel = self._channel(stream or self.active)
+        text = channel.text()  # joined once per new segment, not per read
+        print(f"[SharedState] get_transcription: {len(channel)} segments, {len(text)} chars")
+        return text
 
 # Global instance
 shared_state = SharedState()
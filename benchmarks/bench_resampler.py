@@ -0,0 +1,57 @@
+# bench_resampler.py
+"""CPU cost of 48 kHz → 16 kHz resampling per second of audio.
+
+Compares the old per-chunk np.interp approach of XFYunTranscriptionWorker
+with the cached-tap StreamingResampler, both fed 256-frame capture blocks.
+
+    python -m benchmarks.bench_resampler
+"""
+import time
+import numpy as np
+from cloud_transcription.resampler import StreamingResampler
+
+RATE = 48000
+TARGET = 16000
+BLOCK = 256
+SECONDS = 60
+
+
+def legacy_resample(audio_data, original_rate, target_rate):
+    # verbatim copy of the former XFYunTranscriptionWorker._resample_audio
+    if original_rate == target_rate:
+        return audio_data
+    duration = len(audio_data) / original_rate
+    target_length = int(duration * target_rate)
+    indices = np.linspace(0, len(audio_data) - 1, target_length)
+    return np.interp(indices, np.arange(len(audio_data)), audio_data)
+
+
+def cpu_ms_per_audio_second(fn, blocks):
+    start = time.process_time()
+    for block in blocks:
+        fn(block)
+    return (time.process_time() - start) * 1000 / SECONDS
+
+
+def main():
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal(RATE * SECONDS) * 0.1).astype(np.float32)
+    blocks = [audio[i:i + BLOCK] for i in range(0, len(audio), BLOCK)]
+
+    legacy = cpu_ms_per_audio_second(lambda b: legacy_resample(b, RATE, TARGET), blocks)
+    resampler = StreamingResampler(RATE, TARGET)
+    streaming = cpu_ms_per_audio_second(resampler.process, blocks)
+
+    # the packetizer hands the feeder 40 ms packets, not 256-frame blocks
+    packet = RATE * 40 // 1000
+    packets = [audio[i:i + packet] for i in range(0, len(audio), packet)]
+    resampler.reset()
+    streaming_packets = cpu_ms_per_audio_second(resampler.process, packets)
+
+    print(f"np.interp per 256-frame block : {legacy:7.3f} ms CPU / audio-second")
+    print(f"StreamingResampler, 256 frames: {streaming:7.3f} ms CPU / audio-second")
+    print(f"StreamingResampler, 40 ms     : {streaming_packets:7.3f} ms CPU / audio-second")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# client_pool.py
+import threading
+import time
+
+
+class ClientPool:
+    """Process-wide, lazily created API clients shared by every window.
+
+    Modules register a factory (and optionally a health check) under a name
+    at import time. ``get`` hands out the shared instance, creating it on
+    first use; ``prewarm`` builds clients in the background at start-up so
+    pressing ON reuses a channel that is already authenticated and connected.
+    """
+
+    def __init__(self, health_interval=30.0):
+        self.health_interval = health_interval  # seconds between health checks of a client
+        self._lock = threading.Lock()  # guards the dicts below, never held while connecting
+        self._factories = {}   # name -> (factory, warm, health_check)
+        self._clients = {}
+        self._checked = {}     # name -> monotonic time of the last passing check
+        self._name_locks = {}  # serializes creation of one client
+
+        # stats
+        self.created = {}
+        self.reused = {}
+        self.rebuilt = {}
+
+    def register(self, name, factory, warm=None, health_check=None):
+        """``warm(client)`` opens connections up front; ``health_check(client)`` returns bool."""
+        with self._lock:
+            self._factories[name] = (factory, warm, health_check)
+            self._name_locks.setdefault(name, threading.Lock())
+
+    def get(self, name, check=False):
+        """Return the shared client, rebuilding it if its health check fails.
+
+        The check runs every ``health_interval`` seconds, or now if ``check``
+        is set (e.g. when reconnecting after a stream error).
+        """
+        with self._lock:
+            factory, warm, health_check = self._factories[name]
+            name_lock = self._name_locks[name]
+
+        with name_lock:
+            client = self._clients.get(name)
+            if client is not None:
+                due = check or time.monotonic() - self._checked.get(name, 0) >= self.health_interval
+                if not (due and health_check) or self._healthy(health_check, client):
+                    self._checked[name] = time.monotonic()
+                    self.reused[name] = self.reused.get(name, 0) + 1
+                    return client
+                # only the reference is dropped: other windows may still be streaming
+                # on the old client, which closes its channel once they let go of it
+                print(f"[ClientPool] {name} failed its health check, rebuilding")
+                self.rebuilt[name] = self.rebuilt.get(name, 0) + 1
+
+            client = factory()
+            if warm:
+                try:
+                    warm(client)
+                except Exception as e:
+                    print(f"[ClientPool] Warming {name} failed: {e}")
+            self._clients[name] = client
+            self._checked[name] = time.monotonic()
+            self.created[name] = self.created.get(name, 0) + 1
+            return client
+
+    @staticmethod
+    def _healthy(health_check, client):
+        try:
+            return bool(health_check(client))
+        except Exception:
+            return False
+
+    def prewarm(self, *names):
+        """Create (and connect) clients on a background thread; default is all registered."""
+        with self._lock:
+            names = names or tuple(self._factories)
+
+        def _warm():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"[ClientPool] Could not prewarm {name}: {e}")
+
+        threading.Thread(target=_warm, daemon=True).start()
+
+    def stats(self):
+        return {"created": dict(self.created), "reused": dict(self.reused), "rebuilt": dict(self.rebuilt)}
+
+
+# Global instance
+client_pool = ClientPool()
@@ -0,0 +1,111 @@
+# capture_hub.py
+import threading
+import numpy as np
+import sounddevice as sd
+from cloud_transcription.metrics import DeviceMetrics, metrics_registry
+
+
+class _DeviceCapture:
+    """One open sd.InputStream whose frames are fanned out to subscribers."""
+
+    def __init__(self, device_index, samplerate, channels, blocksize):
+        self.device_index = device_index
+        self.samplerate = samplerate
+        self.channels = channels
+        # Tuples are swapped wholesale on (un)subscribe so the real-time
+        # callback can iterate them without taking a lock.
+        self.subscribers = ()
+        self.status_listeners = ()
+        self._mono = np.zeros(blocksize, dtype=np.float32)
+        self.metrics = DeviceMetrics(device_index, samplerate, blocksize)
+        self.stream = sd.InputStream(
+            samplerate=samplerate,
+            device=device_index,
+            channels=channels,
+            blocksize=blocksize,
+            callback=self._callback
+        )
+
+    def _callback(self, indata, frames, t, status):
+        self.metrics.on_callback(status)
+        if status:
+            for listener in self.status_listeners:
+                listener(status)
+        if indata.shape[1] > 1:
+            if frames > len(self._mono):
+                self._mono = np.zeros(frames, dtype=np.float32)  # only if the host ignores blocksize
+            mono = self._mono[:frames]
+            np.mean(indata, axis=1, out=mono)  # stereo → mono once for everyone
+        else:
+            mono = indata[:, 0]
+        for ring in self.subscribers:
+            ring.write(mono)
+
+
+class CaptureHub:
+    """Opens each input device once and shares it between all consumers.
+
+    Consumers (engine workers, the recorder, level meters, ...) subscribe a
+    bounded buffer with a ``write(frames)`` method, normally an
+    AudioRingBuffer. The stream is opened by the first subscriber and closed
+    when the last one leaves.
+    """
+
+    def __init__(self, blocksize=256):
+        self.blocksize = blocksize
+        self._lock = threading.Lock()  # guards _devices; never taken in the callback
+        self._devices = {}
+
+    def subscribe(self, device_index, ring, channels=1, on_status=None):
+        with self._lock:
+            capture = self._devices.get(device_index)
+            if capture is None:
+                capture = _DeviceCapture(device_index, ring.samplerate, channels or 1, self.blocksize)
+                self._devices[device_index] = capture
+                metrics_registry.register(f"device:{device_index}", capture.metrics)
+                capture.subscribers = (ring,)
+                if on_status:
+                    capture.status_listeners = (on_status,)
+                try:
+                    capture.stream.start()
+                except Exception:
+                    del self._devices[device_index]
+                    metrics_registry.unregister(f"device:{device_index}")
+                    capture.stream.close()
+                    raise
+                return ring
+
+            if capture.samplerate != ring.samplerate:
+                raise ValueError(
+                    f"Device {device_index} is already open at {capture.samplerate} Hz, "
+                    f"cannot subscribe at {ring.samplerate} Hz"
+                )
+            capture.subscribers = capture.subscribers + (ring,)
+            if on_status:
+                capture.status_listeners = capture.status_listeners + (on_status,)
+            return ring
+
+    def unsubscribe(self, device_index, ring, on_status=None):
+        with self._lock:
+            capture = self._devices.get(device_index)
+            if capture is None:
+                return
+            capture.subscribers = tuple(r for r in capture.subscribers if r is not ring)
+            if on_status:
+                capture.status_listeners = tuple(l for l in capture.status_listeners if l != on_status)
+            if not capture.subscribers:
+                del self._devices[device_index]
+                metrics_registry.unregister(f"device:{device_index}")
+                try:
+                    capture.stream.stop()
+                finally:
+                    capture.stream.close()
+
+    def subscriber_count(self, device_index):
+        with self._lock:
+            capture = self._devices.get(device_index)
+            return len(capture.subscribers) if capture else 0
+
+
+# Global instance
+capture_hub = CaptureHub()
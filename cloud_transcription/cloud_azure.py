@@ -1,32 +1,42 @@
 # azure_worker.py
-import sounddevice as sd
-import queue
-import numpy as np
 import os
-import threading
-from pydub import AudioSegment 
-import soundfile as sf
+import time
 from PyQt5.QtCore import QObject, pyqtSignal
 import azure.cognitiveservices.speech as speechsdk
 from dotenv import load_dotenv
+from cloud_transcription.ring_buffer import AudioRingBuffer, to_pcm16
+from cloud_transcription.packetizer import Packetizer, SendTimeline, DEFAULT_PACKET_MS
+from cloud_transcription.capture_hub import capture_hub
+from cloud_transcription.resampler import StreamingResampler
+from cloud_transcription.vad import make_gate
+from cloud_transcription.metrics import EngineMetrics, metrics_registry
 
 load_dotenv()
 
 
 class AzureTranscriptionWorker(QObject):
     transcription_ready = pyqtSignal(str, str)  # text, source ("azure_interim"/"azure_final")
+    segment_ready = pyqtSignal(str, float, float, object)  # final text, capture-clock start/end, [] (no word timings)
     finished = pyqtSignal()
 
-    def __init__(self, device_index, rate=48000, lang="en-US",role="Developer",channels=1):
+    def __init__(self, device_index, rate=48000, target_rate=16000, lang="en-US",role="Developer",channels=1,
+                 packet_ms=DEFAULT_PACKET_MS["azure"], vad=True):
         super().__init__()
         self.device_index = device_index
         self.rate = rate
+        self.target_rate = target_rate  # the recognizer works at 16 kHz; capture stays at the device rate
         self.lang = lang
-        self.q = queue.Queue()
+        self.ring = AudioRingBuffer(int(rate * 10), rate)  # 10 s of headroom
+        self.packetizer = Packetizer(self.ring, packet_ms)
+        self.resampler = StreamingResampler(rate, target_rate)
+        self.vad = make_gate(vad, target_rate)  # gated after resampling so the filter sees continuous audio
         self.audio_buffer = []
         self._running = True
         self.role=role
         self.channels=channels
+        self.metrics = EngineMetrics("azure", role, self.ring, self.vad)
+        self.timeline = SendTimeline(target_rate)
+        self._sent = 0  # samples pushed; result offsets are relative to this stream
 
         # Azure setup
         AZURE_KEY = os.getenv("AZURE_KEY")
@@ -35,7 +45,7 @@ class AzureTranscriptionWorker(QObject):
         speech_config = speechsdk.SpeechConfig(subscription=AZURE_KEY, endpoint=AZURE_ENDPOINT)
         speech_config.speech_recognition_language = self.lang
 
-        audio_format = speechsdk.audio.AudioStreamFormat(samples_per_second=self.rate, bits_per_sample=16, channels=1)
+        audio_format = speechsdk.audio.AudioStreamFormat(samples_per_second=self.target_rate, bits_per_sample=16, channels=1)
         self.stream = speechsdk.audio.PushAudioInputStream(audio_format)
         audio_config = speechsdk.audio.AudioConfig(stream=self.stream)
 
@@ -48,33 +58,39 @@ class AzureTranscriptionWorker(QObject):
         self.recognizer.session_stopped.connect(self._on_session_stopped)
 
     # ==== Audio ====
-    def _callback(self, indata, frames, t, status):
-        if status:
-            self.transcription_ready.emit(f"[status] {status}", "azure_status")
-        if indata.ndim > 1:
-            indata = np.mean(indata, axis=1)  # Stereo → mono
-        self.q.put(indata.copy())
-        #self.audio_buffer.append(indata.copy())
+    def _on_status(self, status):
+        self.transcription_ready.emit(f"[status] {status}", "azure_status")
 
     def _feed_audio(self):
-        while self._running:
-            data = self.q.get()
-            if data is None:
-                self.stream.close()
-                break
-            audio_int16 = (data * 32767).astype(np.int16).tobytes()
-            self.stream.write(audio_int16)
+        for data in self.packetizer:
+            resampled = self.resampler.process(data)
+            for packet in (self.vad.process(resampled) if self.vad else (resampled,)):
+                audio = to_pcm16(packet)
+                self.stream.write(audio)
+                self._sent += len(packet)
+                self.metrics.record_send(len(audio), self.packetizer.last_capture_time)
+            self.timeline.mark(self._sent, self.packetizer.last_capture_time)
+        self.stream.close()
+        if self.vad:
+            self.transcription_ready.emit(f"[vad] {self.vad.summary()}", "azure_status")
 
     # ==== Event Handlers ====
     def _on_recognizing(self, evt):
         if evt.result.reason == speechsdk.ResultReason.RecognizingSpeech:
+            self.metrics.record_result()
             # emit interim
             self.transcription_ready.emit(evt.result.text, "azure_interim")
 
     def _on_recognized(self, evt):
         if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
+            self.metrics.record_result()
             # emit final
             self.transcription_ready.emit(evt.result.text, "azure_final")
+            start = evt.result.offset * self.target_rate // 10_000_000  # 100 ns ticks
+            end = (evt.result.offset + evt.result.duration) * self.target_rate // 10_000_000
+            end_time = self.timeline.capture_time(end) or time.monotonic()
+            start_time = self.timeline.capture_time(start) or end_time
+            self.segment_ready.emit(evt.result.text, start_time, end_time, [])
 
     def _on_canceled(self, evt):
         self.transcription_ready.emit(f"[canceled] {evt}", "azure")
@@ -86,15 +102,18 @@ class AzureTranscriptionWorker(QObject):
     # ==== Main Run ====
     def run(self):
         try:
-            with sd.InputStream(
-                samplerate=self.rate,
-                device=self.device_index,
-                channels=self.channels,
-                blocksize=256,
-                callback=self._callback
-            ):
+            capture_hub.subscribe(self.device_index, self.ring, self.channels, self._on_status)
+            metrics_registry.register(f"azure:{self.role}", self.metrics)
+            try:
                 self.recognizer.start_continuous_recognition()
                 self._feed_audio()  # blocks until stopped
+            finally:
+                try:
+                    metrics_registry.dump_json(f"azure_{self.role}", (f"azure:{self.role}", f"device:{self.device_index}"))
+                except Exception as e:
+                    print(f"[Azure] Could not write metrics: {e}")
+                metrics_registry.unregister(f"azure:{self.role}")
+                capture_hub.unsubscribe(self.device_index, self.ring, self._on_status)
 
         except Exception as e:
             self.transcription_ready.emit(f"Error: {e}", "error")
@@ -105,7 +124,7 @@ class AzureTranscriptionWorker(QObject):
         if not self._running:
             return
         self._running = False
-        self.q.put(None)
+        self.ring.close()
         try:
             self.recognizer.stop_continuous_recognition()
         except Exception:
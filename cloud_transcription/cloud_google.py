@@ -1,18 +1,19 @@
 # gcp_worker.py
-import sounddevice as sd
-import queue
-import sys
-import numpy as np
 import time
-from pydub import AudioSegment 
-import soundfile as sf
 from PyQt5.QtCore import QObject, pyqtSignal
 from google.cloud import speech
+import grpc
 import os
-import requests
-import io
 import threading
+import queue
+from collections import deque
 from dotenv import load_dotenv
+from cloud_transcription.ring_buffer import AudioRingBuffer, to_pcm16
+from cloud_transcription.packetizer import Packetizer, SendTimeline, DEFAULT_PACKET_MS
+from cloud_transcription.capture_hub import capture_hub
+from cloud_transcription.vad import make_gate
+from cloud_transcription.metrics import EngineMetrics, metrics_registry
+from client_pool import client_pool
 
 load_dotenv()
 path = os.getenv("Google_json_path")
@@ -20,104 +21,271 @@ path = os.getenv("Google_json_path")
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = os.getenv("Google_json_path")
 
 
+def _channel_ready(client, timeout=10):
+    """Connect the client's gRPC channel (TLS + auth) and wait until it is READY."""
+    grpc.channel_ready_future(client.transport.grpc_channel).result(timeout=timeout)
+    return True
+
+
+# one SpeechClient (and gRPC channel) for the whole process
+client_pool.register("gcp_speech", speech.SpeechClient,
+                     warm=_channel_ready, health_check=lambda client: _channel_ready(client, timeout=3))
+
+
+class _StreamSession:
+    """One ``streaming_recognize`` call fed from a queue of PCM chunks.
+
+    ``base`` is the position, on the worker's sent-sample timeline, of the
+    first sample fed to this stream; the server's ``result_end_time`` is
+    relative to it.
+    """
+
+    def __init__(self, base, prev=None):
+        self.base = base
+        self.prev = prev
+        self.next = None
+        self.started = time.monotonic()
+        self.queue = queue.Queue()
+        self.done = threading.Event()
+        self.error = None
+        self.held = []  # finals waiting for ``prev`` to deliver its last results
+        self.thread = None
+
+    def requests(self):
+        while True:
+            audio = self.queue.get()
+            if audio is None:
+                return
+            yield speech.StreamingRecognizeRequest(audio_content=audio)
+
+    def send(self, audio):
+        self.queue.put(audio)
+
+    def close(self):
+        self.queue.put(None)  # half-close: the server returns its last finals and ends
+
+
 class GCPTranscriptionWorker(QObject):
+    """Streams to Google STT, rolling over to a fresh stream before the limit.
+
+    Google ends a streaming call after about five minutes. ``rollover_s``
+    before that the next call is opened, ``overlap_s`` of already sent audio
+    is replayed into it and live audio switches over; the old call is then
+    half-closed so it still returns its pending finals. Finals of the new
+    call are held until the old one has finished, and anything ending
+    before the last emitted final (by ``result_end_time``) is dropped.
+    """
     transcription_ready = pyqtSignal(str, str)  # text, source
+    segment_ready = pyqtSignal(str, float, float, object)  # final text, capture-clock start/end, [(offset_s, word)]
     finished = pyqtSignal()
 
-    def __init__(self, device_index, rate=48000, lang="en-GB",role="Developer",channels=1):
+    def __init__(self, device_index, rate=48000, lang="en-GB",role="Developer",channels=1,
+                 packet_ms=DEFAULT_PACKET_MS["gcp"], vad=True,
+                 rollover_s=240.0, overlap_s=1.5, replay_s=8.0):
         super().__init__()
         self.device_index = device_index
         self.rate = rate
         self.lang = lang
-        self.q = queue.Queue()
+        self.ring = AudioRingBuffer(int(rate * 10), rate)  # 10 s of headroom
+        self.packetizer = Packetizer(self.ring, packet_ms)
+        self.vad = make_gate(vad, rate)
         self._running = True
         self.audio_buffer = []
         #self.save_path="developer.mp3" 
         self.role=role
         self.send_buffer = []
         self.channels=channels
+        self.metrics = EngineMetrics("gcp", role, self.ring, self.vad)
 
-    def _callback(self, indata, frames, t, status):
-        if status:
-            self.transcription_ready.emit(f"[status] {status}", "gcp")
-        if indata.ndim > 1:
-            indata = np.mean(indata, axis=1)  # stereo → mono
-        self.q.put(indata.copy())
+        # rollover
+        self.rollover_s = rollover_s
+        self.overlap = int(rate * overlap_s)  # replayed into the next stream on rollover
+        self.replay = int(rate * replay_s)    # replayed after an error (audio since the last final)
+        self._client = None
+        self._streaming_config = None
+        self._session = None
+        self._sent = 0              # samples sent so far: the timeline results are mapped onto
+        self._final_end = 0         # sent-sample position where the last emitted final ended
+        self._history = deque()     # (start, pcm, frames) of recently sent chunks
+        self.timeline = SendTimeline(rate)
+        self._lock = threading.Lock()  # orders results coming from two streams
+        self.rollovers = 0
+        self.duplicates_dropped = 0
 
+    def _on_status(self, status):
+        self.transcription_ready.emit(f"[status] {status}", "gcp")
 
+    # ==== Streams ====
+    def _connect(self, check=False):
+        self._client = client_pool.get("gcp_speech", check=check)  # hot, shared channel
+        config = speech.RecognitionConfig(
+            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+            sample_rate_hertz=self.rate,
+            language_code=self.lang,
+            enable_word_time_offsets=True,  # lets overlapping finals be trimmed word by word
+        )
+        self._streaming_config = speech.StreamingRecognitionConfig(
+            config=config,
+            interim_results=True
+        )
 
-    def _request_generator(self):
-        while self._running:
-            data = self.q.get()
-            if data is None:
-                break
-            audio_int16 = (data * 32767).astype(np.int16).tobytes()
-            yield speech.StreamingRecognizeRequest(audio_content=audio_int16)
+    def _open_session(self, replay_from, prev=None):
+        """Start a new stream, replaying sent audio from ``replay_from`` on."""
+        chunks = [c for c in self._history if c[0] + c[2] > replay_from]
+        session = _StreamSession(chunks[0][0] if chunks else self._sent, prev)
+        for _, pcm, _ in chunks:
+            session.send(pcm)
+        if prev:
+            prev.next = session
+        session.thread = threading.Thread(target=self._consume, args=(session,), daemon=True)
+        session.thread.start()
+        return session
 
+    def _consume(self, session):
+        try:
+            responses = self._client.streaming_recognize(self._streaming_config, session.requests())
+            for response in responses:
+                for result in response.results:
+                    self._on_result(session, result)
+        except Exception as e:
+            session.error = e
+        finally:
+            with self._lock:
+                session.done.set()
+                nxt = session.next
+                if nxt:
+                    for result in nxt.held:
+                        self._emit_final(nxt, result)
+                    nxt.held.clear()
 
+    def _on_result(self, session, result):
+        self.metrics.record_result()
+        with self._lock:
+            waiting = session.prev is not None and not session.prev.done.is_set()
+            if not result.is_final:
+                # the old stream still owns the display until it has finished
+                if session is self._session and not waiting:
+                    self.transcription_ready.emit(result.alternatives[0].transcript, "gcp_interim")
+            elif waiting:
+                session.held.append(result)
+            else:
+                self._emit_final(session, result)
+
+    def _emit_final(self, session, result):
+        end = session.base + int(result.result_end_time.total_seconds() * self.rate)
+        if end <= self._final_end:
+            self.duplicates_dropped += 1  # already delivered by the previous stream
+            return
+        alt = result.alternatives[0]
+        text = alt.transcript
+        words = alt.words
+        if session.base < self._final_end and alt.words:
+            # starts inside the replayed overlap: keep only words that are new
+            words = [w for w in alt.words
+                     if session.base + w.end_time.total_seconds() * self.rate > self._final_end]
+            text = " ".join(w.word for w in words)
+        start = self._final_end  # without word timings: right after the previous final
+        if words:
+            start = session.base + int(words[0].start_time.total_seconds() * self.rate)
+        self._final_end = end
+        if text.strip():
+            self.transcription_ready.emit(text.strip(), "gcp_final")
+            end_time = self.timeline.capture_time(end) or time.monotonic()
+            start_time = self.timeline.capture_time(start) or end_time
+            offsets = [
+                ((self.timeline.capture_time(session.base + int(w.start_time.total_seconds() * self.rate))
+                  or start_time) - start_time, w.word + " ")
+                for w in words
+            ]
+            self.segment_ready.emit(text.strip(), start_time, end_time, offsets)
+
+    def _remember(self, pcm, frames):
+        self._history.append((self._sent, pcm, frames))
+        keep = max(self.overlap, self.replay)
+        while self._history and self._sent - self._history[0][0] > keep:
+            self._history.popleft()
+
+    def _reconnect(self, failed, attempt):
+        """Replace a stream that ended, backing off and retrying until a new one is open."""
+        failed.close()  # release its request iterator, still blocked on the queue
+        if failed.error is None:
+            self.transcription_ready.emit(f"[status] stream ended by the server, reconnecting (attempt {attempt})",
+                                          "gcp_status")
+        else:
+            self.transcription_ready.emit(f"[gcp error] {repr(failed.error)} (attempt {attempt})", "error")
+        while True:
+            # audio keeps landing in the ring while we back off, nothing is lost
+            delay = min(5.0, 1.0 * 1.5 ** (attempt - 1))
+            for _ in range(int(delay * 10)):
+                if not self._running:
+                    break
+                time.sleep(0.1)
+            try:
+                self._connect(check=True)
+                return self._open_session(max(self._final_end, self._sent - self.replay), failed)
+            except Exception as e:
+                if not self._running:
+                    raise  # stopping anyway; don't retry forever
+                attempt += 1
+                self.transcription_ready.emit(f"[gcp error] {repr(e)} (attempt {attempt})", "error")
+
+    # ==== Main Run ====
     def run(self):
-            reconnect_delay = 1.0
-            try_count = 0
-            while self._running:
-                try:
-                    client = speech.SpeechClient()
-                    config = speech.RecognitionConfig(
-                        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-                        sample_rate_hertz=self.rate,
-                        language_code=self.lang,
-                    )
-                    streaming_config = speech.StreamingRecognitionConfig(
-                        config=config,
-                        interim_results=True
-                    )
-
-                    with sd.InputStream(
-                        samplerate=self.rate,
-                        device=self.device_index,
-                        blocksize=256,
-                        channels=self.channels,
-                        callback=self._callback
-                    ):
-                        # generator that yields audio chunks
-                        requests = self._request_generator()
-                        responses = client.streaming_recognize(streaming_config, requests)
-
-                        for response in responses:
-                            if not self._running:
-                                break
-                            for result in response.results:
-                                transcript = result.alternatives[0].transcript
-                                if result.is_final:
-                                    self.transcription_ready.emit(transcript, "gcp_final")
-                                else:
-                                    self.transcription_ready.emit(transcript, "gcp_interim")
-
-                    # if loop exits cleanly, break if stopping, otherwise try reconnecting
-                    if not self._running:
-                        break
-
-                except Exception as e:
-                    # emit useful debug to UI and try to reconnect a few times
-                    try_count += 1
-                    self.transcription_ready.emit(f"[gcp error] {repr(e)} (attempt {try_count})", "error")
-                    # short delay before reconnecting; if user requested stop, this will end
-                    for _ in range(int(reconnect_delay * 10)):
-                        if not self._running:
-                            break
-                        time.sleep(0.1)
-                    # gradually increase delay (cap it)
-                    reconnect_delay = min(5.0, reconnect_delay * 1.5)
-                    continue
+            try:
+                # subscribe once; audio keeps landing in the ring across reconnects
+                capture_hub.subscribe(self.device_index, self.ring, self.channels, self._on_status)
+            except Exception as e:
+                self.transcription_ready.emit(f"Error: {e}", "error")
+                self.finished.emit()
+                return
+            metrics_registry.register(f"gcp:{self.role}", self.metrics)
+
+            try:
+                self._connect()
+                self._session = self._open_session(0)
+                try_count = 0
+                for data in self.packetizer:  # ends once stop() closes the ring
+                    for packet in (self.vad.process(data) if self.vad else (data,)):
+                        session = self._session
+                        if session.done.is_set():
+                            try_count += 1
+                            session = self._reconnect(session, try_count)
+                        elif time.monotonic() - session.started >= self.rollover_s:
+                            session = self._open_session(self._sent - self.overlap, session)
+                            self._session.close()
+                            self.rollovers += 1
+                        else:
+                            try_count = 0
+                        self._session = session
+
+                        audio = to_pcm16(packet)
+                        session.send(audio)
+                        self._remember(audio, len(packet))
+                        self._sent += len(packet)
+                        self.metrics.record_send(len(audio), self.packetizer.last_capture_time)
+                    self.timeline.mark(self._sent, self.packetizer.last_capture_time)
+
+                # flush: let the last stream return its finals
+                self._session.close()
+                self._session.thread.join(timeout=5)
+            except Exception as e:
+                self.transcription_ready.emit(f"[gcp error] {repr(e)}", "error")
 
             # final cleanup
+            try:
+                metrics_registry.dump_json(f"gcp_{self.role}", (f"gcp:{self.role}", f"device:{self.device_index}"))
+            except Exception as e:
+                print(f"[GCP] Could not write metrics: {e}")
+            metrics_registry.unregister(f"gcp:{self.role}")
+            capture_hub.unsubscribe(self.device_index, self.ring, self._on_status)
+            self.transcription_ready.emit(
+                f"[rollover] {self.rollovers} rollovers, {self.duplicates_dropped} duplicate finals dropped", "gcp_status")
+            if self.vad:
+                self.transcription_ready.emit(f"[vad] {self.vad.summary()}", "gcp_status")
             self.finished.emit()
 
 
     def stop(self):
             self._running = False
-            # push sentinel to unblock request generator
-            try:
-                self.q.put(None)
-            except Exception:
-                pass
-
+            # close the ring: the feed loop drains it and half-closes the stream
+            self.ring.close()
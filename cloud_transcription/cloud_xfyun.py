@@ -1,8 +1,4 @@
 # xfyun_worker.py
-import sounddevice as sd
-import queue
-import sys
-import numpy as np
 import websocket
 import json
 import base64
@@ -10,13 +6,19 @@ import hmac
 import hashlib
 import time
 import threading
+from collections import deque
 from datetime import datetime,timezone
 from urllib.parse import urlencode
 from PyQt5.QtCore import QObject, pyqtSignal
 from dotenv import load_dotenv
 import os
-from pydub import AudioSegment 
-import soundfile as sf
+from cloud_transcription.ring_buffer import AudioRingBuffer
+from cloud_transcription.packetizer import Packetizer, SendTimeline, DEFAULT_PACKET_MS
+from cloud_transcription.capture_hub import capture_hub
+from cloud_transcription.resampler import StreamingResampler
+from cloud_transcription.vad import make_gate
+from cloud_transcription.xfyun_frames import IatFrameEncoder
+from cloud_transcription.metrics import EngineMetrics, metrics_registry
 
 load_dotenv()
 
@@ -29,124 +31,301 @@ XFYUN_API_SECRET = os.getenv("XFYUN_API_SECRET")   # Replace with your API Secre
 XFYUN_API_KEY = os.getenv("XFYUN_API_KEY") 
 
 
+class _IatSession:
+    """One authenticated IAT websocket and the text it has returned so far."""
+
+    def __init__(self, worker, prev=None):
+        self.rate = worker.target_rate
+        self.prev = prev
+        self.next = None
+        self.is_connected = False
+        self.opened = time.monotonic()
+        self.connect_done = threading.Event()  # set on open, error or close
+        self.finalized = threading.Event()     # last result received, or the socket is gone
+        self.sent_samples = 0
+        self.pieces = []      # IAT results are incremental; the session text is their join
+        self.words = []       # (position in the session's audio, word), from each word's ``bg``
+        self.timeline = SendTimeline(self.rate)  # session audio position -> capture time
+        self.start_time = None  # capture time of the first audio this session was sent
+        self.end_time = None  # capture time of the last audio this session was sent
+        self.held = None      # (text, source) waiting for ``prev`` to finalize
+        self.ws = websocket.WebSocketApp(
+            worker._create_url(),
+            on_open=lambda ws: worker._on_open(self),
+            on_message=lambda ws, message: worker._on_message(self, message),
+            on_error=lambda ws, error: worker._on_error(self, error),
+            on_close=lambda ws, code, msg: worker._on_close(self)
+        )
+        threading.Thread(target=self.ws.run_forever, daemon=True).start()
+
+    @property
+    def seconds_sent(self):
+        return self.sent_samples / self.rate
+
+
 class XFYunTranscriptionWorker(QObject):
+    """Streams 16 kHz PCM to the XFYun IAT websocket, rotating sessions.
+
+    Everything waits on events rather than fixed sleeps: ``run`` continues
+    the moment the socket opens (or fails), and the sender blocks on the
+    packetizer so it sends exactly the audio that is there, back-to-back
+    when it is behind.
+
+    An IAT session only accepts about a minute of audio, so once a session
+    has carried ``preconnect_s`` the next websocket is opened in the
+    background. Audio switches to it at the first silent packet after
+    ``rotate_s`` (at the latest at ``max_session_s``) on a frame boundary;
+    every frame goes to exactly one session, so nothing is lost or sent
+    twice. The old session is ended with a status-2 frame, and the new
+    session's results are held until the old one has delivered its last.
+
+    Encoded frames wait in a backlog until a send succeeds, so audio
+    captured while no session is connected (or a send fails) goes out once
+    one is; past ``backlog_s`` the oldest is dropped and counted.
+    """
     transcription_ready = pyqtSignal(str, str)  # (text, source: "xfyun_interim"/"xfyun_final")
+    segment_ready = pyqtSignal(str, float, float, object)  # final text, capture-clock start/end, [(offset_s, word)]
     finished = pyqtSignal()
 
-    def __init__(self, device_index, rate=48000, target_rate=16000, lang="en_us",role="Developer",channels=1):
+    def __init__(self, device_index, rate=48000, target_rate=16000, lang="en_us",role="Developer",channels=1,
+                 packet_ms=DEFAULT_PACKET_MS["xfyun"], vad=True, connect_timeout=10.0,
+                 preconnect_s=40.0, rotate_s=45.0, max_session_s=55.0, backlog_s=10.0):
         super().__init__()
         self.device_index = device_index
         self.rate = rate
         self.target_rate = target_rate
         self.lang = lang
-        self.q = queue.Queue()
+        self.ring = AudioRingBuffer(int(rate * 10), rate)  # 10 s of headroom
+        self.packetizer = Packetizer(self.ring, packet_ms)
+        self.resampler = StreamingResampler(rate, target_rate)
+        self.vad = make_gate(vad, target_rate)  # gated after resampling so the filter sees continuous audio
         self._running = True
-        self.ws = None
-        self.is_connected = False
+        self.connect_timeout = connect_timeout
+        self.preconnect_s = preconnect_s
+        self.rotate_s = rotate_s
+        self.max_session_s = max_session_s
+        self.backlog_samples = int(target_rate * backlog_s)
+        self._backlog = deque()  # [frames not yet sent, samples, capture time] per packet
+        self._backlog_len = 0    # samples in the backlog
+        self._reconnect_at = 0.0  # monotonic time before which no new session is opened
+        self._session = None  # receives audio
+        self._next = None     # pre-connected, waiting for the switch
+        self._lock = threading.Lock()  # orders results coming from two sessions
         self.frame_count = 0
+        self.rotations = 0
+        self.send_errors = 0
+        self.dropped_samples = 0  # audio dropped from a full backlog
         self.role=role
         self.channels=channels
+        self.metrics = EngineMetrics("xfyun", role, self.ring, self.vad)
+        self.encoder = IatFrameEncoder(XFYUN_APPID, {
+            "language": self.lang,
+            "domain": "iat",
+            "accent": "english",
+            "vad_eos": 60000,
+        }, target_rate)
+
+    @property
+    def is_connected(self):
+        return bool(self._session and self._session.is_connected)
 
     # ------------------- Audio Handling -------------------
-    def _callback(self, indata, frames, t, status):
-        if status:
-            self.transcription_ready.emit(f"[status] {status}", "xfyun_status")
-        if indata.ndim > 1:
-            indata = np.mean(indata, axis=1)  # stereo → mono
-        self.q.put(indata.copy())
-
-    def _resample_audio(self, audio_data, original_rate, target_rate):
-        if original_rate == target_rate:
-            return audio_data
-        duration = len(audio_data) / original_rate
-        target_length = int(duration * target_rate)
-        indices = np.linspace(0, len(audio_data) - 1, target_length)
-        return np.interp(indices, np.arange(len(audio_data)), audio_data)
+    def _on_status(self, status):
+        self.transcription_ready.emit(f"[status] {status}", "xfyun_status")
 
     # ------------------- WebSocket Callbacks -------------------
-    def _on_message(self, ws, message):
+    def _on_message(self, session, message):
         try:
             data = json.loads(message)
             if data.get("code") != 0:
                 self.transcription_ready.emit(f"XFYun Error: {data.get('message')}", "xfyun_error")
                 return
 
-            results = data.get('data', {}).get('result', {})
+            payload = data.get('data', {})
+            results = payload.get('result', {})
             if results:
-                text = "".join(cw.get('w', '') for ws_item in results.get('ws', []) for cw in ws_item.get('cw', []))
+                self.metrics.record_result()
+                text = ""
+                for ws_item in results.get('ws', []):
+                    word = "".join(cw.get('w', '') for cw in ws_item.get('cw', []))
+                    if word:
+                        # ``bg`` is the word's offset in the session audio, in 10 ms frames
+                        session.words.append((ws_item.get('bg', 0) * session.rate // 100, word))
+                        text += word
                 if text:
-                    status = data.get('data', {}).get('status', 0)
-                    if status == 2:  # final result
-                        self.transcription_ready.emit(text, "xfyun_final")
-                    else:  # interim
-                        self.transcription_ready.emit(text, "xfyun_interim")
+                    session.pieces.append(text)
+            if payload.get('status') == 2:  # final result of the session
+                self._deliver(session, "".join(session.pieces), "xfyun_final")
+                if session.pieces:
+                    self._emit_segment(session)
+                self._finalize(session)
+                session.ws.close()
+            elif results:
+                self._deliver(session, "".join(session.pieces), "xfyun_interim")
 
         except Exception as e:
             self.transcription_ready.emit(f"Parse error: {e}", "xfyun_error")
 
-    def _on_error(self, ws, error):
+    def _deliver(self, session, text, source):
+        if not text:
+            return
+        with self._lock:
+            if session.prev and not session.prev.finalized.is_set():
+                session.held = (text, source)  # the old session still owns the display
+                return
+        self.transcription_ready.emit(text, source)
+
+    def _finalize(self, session):
+        with self._lock:
+            if session.finalized.is_set():
+                return
+            session.finalized.set()
+            nxt = session.next
+            nxt_held = None
+            if nxt and nxt.held:
+                nxt_held, nxt.held = nxt.held, None
+        if nxt_held:
+            self.transcription_ready.emit(*nxt_held)
+
+    def _on_error(self, session, error):
         self.transcription_ready.emit(f"WebSocket error: {error}", "xfyun_error")
+        session.connect_done.set()
 
-    def _on_close(self, ws, code, msg):
-        self.is_connected = False
-        self.transcription_ready.emit("🔌 Connection closed", "xfyun_status")
+    def _on_close(self, session):
+        session.is_connected = False
+        session.connect_done.set()
+        self._finalize(session)
+        if session is self._session:
+            self.transcription_ready.emit("🔌 Connection closed", "xfyun_status")
 
-    def _on_open(self, ws):
-        self.is_connected = True
-        self.frame_count = 0
-        self.transcription_ready.emit("✅ Connected to XFYun", "xfyun_status")
+    def _on_open(self, session):
+        session.is_connected = True
+        session.connect_done.set()
+        if session.prev is None:
+            self.transcription_ready.emit("✅ Connected to XFYun", "xfyun_status")
 
         # initial frame (handshake)
-        params = {
-            "common": {"app_id": XFYUN_APPID},
-            "business": {
-                "language": self.lang,
-                "domain": "iat",
-                "accent": "english",
-                "vad_eos": 60000,
-            },
-            "data": {
-                "status": 0,
-                "format": "audio/L16;rate=16000",
-                "encoding": "raw",
-                "audio": ""
-            }
-        }
-        ws.send(json.dumps(params))
+        session.ws.send(self.encoder.first_frame())
+
+    # ------------------- Sessions -------------------
+    def _open_session(self, prev=None):
+        session = _IatSession(self, prev)
+        if prev:
+            prev.next = session
+        return session
+
+    def _end_session(self, session):
+        """Send the closing frame; the session finalizes and closes in the background."""
+        if session.is_connected:
+            session.ws.send(self.encoder.final_frame)
+        else:
+            self._finalize(session)
+
+    def _maybe_rotate(self, silent):
+        """Pre-connect and switch sessions; called between frames only, never blocks."""
+        current = self._session
+        age = current.seconds_sent
+        if (self._next is None and (age >= self.preconnect_s or not current.is_connected)
+                and time.monotonic() >= self._reconnect_at):
+            self._next = self._open_session(current)
+
+        nxt = self._next
+        if nxt is None:
+            return
+        if not nxt.connect_done.is_set() and time.monotonic() - nxt.opened < self.connect_timeout:
+            return  # still connecting; audio waits in the backlog meanwhile
+        if current.is_connected and nxt.is_connected and not (
+                age >= self.max_session_s or (silent and age >= self.rotate_s)):
+            return
+        if not nxt.is_connected:
+            self.transcription_ready.emit("❌ Failed to reconnect to XFYun", "xfyun_error")
+            nxt.ws.close()
+            self._next = None
+            self._reconnect_at = time.monotonic() + 2.0
+            return
+
+        # switch now if the server ended the current session early
+        self._end_session(current)
+        self._session, self._next = nxt, None
+        self.rotations += 1
+        print(f"[XFYun] Rotated to a new session after {age:.1f}s of audio")
+
+    def _emit_segment(self, session):
+        end_time = session.end_time or time.monotonic()
+        start_time = session.start_time or end_time
+        offsets = [((session.timeline.capture_time(position) or start_time) - start_time, word)
+                   for position, word in session.words]
+        self.segment_ready.emit("".join(session.pieces), start_time, end_time, offsets)
 
     # ------------------- Audio Sending -------------------
     def _send_audio_data(self):
-        while self._running:
+        failures = 0        # consecutive, for the back-off
+        last_report = 0.0   # monotonic time of the last "Send error" shown
+        while True:  # after stop() the closed ring is drained, then None ends the loop
             try:
-                if not self.is_connected:
-                    time.sleep(0.1)
-                    continue
-
-                data = self.q.get(timeout=1.0)
+                # blocks until packet_ms of audio is captured: paced by the
+                # audio itself, and a backlog is drained back-to-back
+                data = self.packetizer.next_packet()
                 if data is None:
                     break
 
-                resampled = self._resample_audio(data, self.rate, self.target_rate)
-                audio_int16 = (resampled * 32767).astype(np.int16)
-                audio_b64 = base64.b64encode(audio_int16.tobytes()).decode('utf-8')
-
-                frame = {
-                    "data": {
-                        "status": 0 if self.frame_count == 0 else 1,
-                        "format": "audio/L16;rate=16000",
-                        "encoding": "raw",
-                        "audio": audio_b64
-                    }
-                }
-                self.ws.send(json.dumps(frame))
-                self.frame_count += 1
-                time.sleep(0.04)
+                resampled = self.resampler.process(data)
+                packets = self.vad.process(resampled) if self.vad else (resampled,)
+                self._maybe_rotate(silent=bool(self.vad) and not self.vad.active)
+
+                # exact 1280-byte frames; a pause sends the remainder (and keepalives) right away
+                frames = [frame for packet in packets for frame in self.encoder.encode(packet)]
+                if self.vad and not self.vad.active:
+                    frames += self.encoder.flush()
+                self._queue(frames, sum(len(packet) for packet in packets), self.packetizer.last_capture_time)
+                if self._session.is_connected:
+                    self._send_backlog(self._session)
+                failures = 0
 
-            except queue.Empty:
-                continue
             except Exception as e:
-                self.transcription_ready.emit(f"Send error: {e}", "xfyun_error")
-                break
+                # back off instead of failing on every packet; unsent frames stay in the backlog
+                failures += 1
+                self.send_errors += 1
+                now = time.monotonic()
+                if now - last_report >= 5.0:
+                    repeats = f" ({failures} in a row)" if failures > 1 else ""
+                    self.transcription_ready.emit(f"Send error: {e}{repeats}", "xfyun_error")
+                    last_report = now
+                time.sleep(min(0.05 * 2 ** (failures - 1), 2.0))
+
+        self._queue(self.encoder.flush(), 0, self.packetizer.last_capture_time)
+        if self.is_connected:
+            self._send_backlog(self._session)
+        if self._backlog_len:
+            self.dropped_samples += self._backlog_len
+            self.transcription_ready.emit(
+                f"[backlog] {self._backlog_len / self.target_rate:.1f}s of audio could not be sent", "xfyun_error")
+
+    def _queue(self, frames, samples, capture_time):
+        self._backlog.append([deque(frames), samples, capture_time])
+        self._backlog_len += samples
+        while self._backlog_len > self.backlog_samples and len(self._backlog) > 1:
+            _, dropped, _ = self._backlog.popleft()
+            self._backlog_len -= dropped
+            self.dropped_samples += dropped
+
+    def _send_backlog(self, session):
+        """Send queued frames in order; a frame leaves the backlog only once it went out."""
+        while self._backlog:
+            frames, samples, capture_time = self._backlog[0]
+            while frames:
+                session.ws.send(frames[0])  # ASCII JSON bytes, sent as a text frame without re-encoding
+                frame = frames.popleft()
+                self.frame_count += 1
+                self.metrics.record_send(len(frame), capture_time)
+            self._backlog.popleft()
+            self._backlog_len -= samples
+
+            if session.start_time is None and samples and capture_time:
+                session.start_time = capture_time - samples / self.target_rate
+            session.sent_samples += samples
+            session.end_time = capture_time
+            session.timeline.mark(session.sent_samples, session.end_time)
 
     # ------------------- Main Run -------------------
     def _create_url(self):
@@ -182,67 +361,57 @@ class XFYunTranscriptionWorker(QObject):
     def run(self):
         try:
             print("[XFYun] Starting worker...")
-            url = self._create_url()
-            print("[XFYun] Connecting to:", url)
-
-            self.ws = websocket.WebSocketApp(
-                url,
-                on_open=self._on_open,
-                on_message=self._on_message,
-                on_error=self._on_error,
-                on_close=self._on_close
-            )
-            ws_thread = threading.Thread(target=self.ws.run_forever, daemon=True)
-            ws_thread.start()
-
-            # wait for connection
-            #print("[XFYun] Waiting for connection...")
-            time.sleep(2)
+            t0 = time.monotonic()
+            self._session = self._open_session()
+
+            # wait for the socket to open (or fail) rather than a fixed delay
+            self._session.connect_done.wait(self.connect_timeout)
             if not self.is_connected:
                 self.transcription_ready.emit("❌ Failed to connect to XFYun", "xfyun_error")
                 print("[XFYun] Connection failed")
+                self._session.ws.close()  # stop its run_forever thread
                 self.finished.emit()
                 return
 
-            print("[XFYun] Connection established, starting audio...")
-            # audio sending thread
-            audio_thread = threading.Thread(target=self._send_audio_data, daemon=True)
-            audio_thread.start()
-
-            with sd.InputStream(
-                samplerate=self.rate,
-                device=self.device_index,
-                channels=self.channels,
-                blocksize=256,
-                callback=self._callback
-            ):
+            print(f"[XFYun] Connection established in {(time.monotonic() - t0) * 1000:.0f} ms, starting audio...")
+            capture_hub.subscribe(self.device_index, self.ring, self.channels, self._on_status)
+            metrics_registry.register(f"xfyun:{self.role}", self.metrics)
+            try:
                 print("[XFYun] Audio stream open, capturing...")
-                while self._running:
-                    time.sleep(0.1)
+                self._send_audio_data()  # blocks until stop() closes the ring
+            finally:
+                try:
+                    metrics_registry.dump_json(f"xfyun_{self.role}", (f"xfyun:{self.role}", f"device:{self.device_index}"))
+                except Exception as e:
+                    print(f"[XFYun] Could not write metrics: {e}")
+                metrics_registry.unregister(f"xfyun:{self.role}")
+                capture_hub.unsubscribe(self.device_index, self.ring, self._on_status)
 
             #print("[XFYun] Stopping stream, sending final frame...")
-            # final closing frame
-            if self.is_connected and self.ws:
-                final_frame = {
-                    "data": {
-                        "status": 2,
-                        "format": "audio/L16;rate=16000",
-                        "encoding": "raw",
-                        "audio": ""
-                    }
-                }
-                self.ws.send(json.dumps(final_frame))
-                time.sleep(1)
-                self.ws.close()
+            # final closing frame; the server closes once the last result is out
+            session = self._session
+            self._end_session(session)
+            session.finalized.wait(2)
+            session.ws.close()
+            if self._next:
+                self._next.ws.close()
 
         except Exception as e:
             print("[XFYun] Exception in run:", e)
             self.transcription_ready.emit(f"Error: {e}", "xfyun_error")
 
+        lag = self.metrics.capture_to_send_ms
+        if lag.total:
+            self.transcription_ready.emit(
+                f"[send lag] p50 {lag.percentile(50):.0f} ms, p99 {lag.percentile(99):.0f} ms, max {lag.max:.0f} ms", "xfyun_status")
+        if self.rotations:
+            self.transcription_ready.emit(f"[rotation] {self.rotations} session handovers", "xfyun_status")
+        if self.vad:
+            self.transcription_ready.emit(f"[vad] {self.vad.summary()}", "xfyun_status")
         print("[XFYun] Worker finished")
         self.finished.emit()
 
     def stop(self):
         self._running = False
-        self.q.put(None)
-
+        # the sender drains the ring, then run() closes the session
+        self.ring.close()
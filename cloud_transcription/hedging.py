@@ -0,0 +1,158 @@
+# hedging.py
+import time
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QObject, QThread, Qt, pyqtSignal, pyqtSlot
+from cloud_transcription.cloud_google import GCPTranscriptionWorker
+from cloud_transcription.cloud_azure import AzureTranscriptionWorker
+from cloud_transcription.cloud_xfyun import XFYunTranscriptionWorker
+from cloud_transcription.local_whisper import WhisperTranscriptionWorker
+from cloud_transcription.segment_merge import SegmentMerger
+
+# dropdown label -> (engine key, worker class)
+ENGINES = {
+    "Engine 1": ("gcp", GCPTranscriptionWorker),
+    "Engine 2": ("azure", AzureTranscriptionWorker),
+    "Engine 3": ("xfyun", XFYunTranscriptionWorker),
+    "Engine 4": ("whisper", WhisperTranscriptionWorker),
+}
+HEDGED_ENGINES = ["Engine 1 + 2", "Engine 1 + 3", "Engine 2 + 3", "Engine 1 + 4"]
+
+
+def create_transcription_worker(selected_engine, **kwargs):
+    """Build the worker for a dropdown entry; "Engine 1 + 2" gives a hedged pair."""
+    if "+" in selected_engine:
+        numbers = [n.strip() for n in selected_engine.replace("Engine", "").split("+")]
+        workers = {}
+        for number in numbers:
+            engine, cls = ENGINES[f"Engine {number}"]
+            workers[engine] = cls(**kwargs)
+        return HedgedTranscriptionWorker(workers)
+    return ENGINES[selected_engine][1](**kwargs)
+
+
+class HedgedTranscriptionWorker(QObject):
+    """Runs several engine workers on the same hub device and merges their finals.
+
+    Finals are aligned on the capture clock via the workers' ``segment_ready``
+    signal, which carries the start and end of their audio: the first final
+    to cover a stretch of audio is emitted, a final from another engine that
+    lies inside what was already emitted is suppressed, and one that only
+    overlaps it is trimmed to its new words (``SegmentMerger``). Each engine's
+    final latency (arrival minus end of its audio) feeds an EWMA; the
+    fastest engine is primary and is the only one whose interims are shown.
+
+    Exposes the same ``transcription_ready``/``finished``/``run``/``stop``
+    interface as a single worker, so the windows treat it like one: ``run``
+    blocks until both engines have finished and ``stop`` joins them, so the
+    windows' stop/quit/wait sequence still delivers their trailing finals.
+    """
+    transcription_ready = pyqtSignal(str, str)  # text, source of the engine that won
+    finished = pyqtSignal()
+
+    def __init__(self, workers, tolerance_s=0.3, alpha=0.2):
+        super().__init__()
+        self.workers = workers  # engine key -> worker
+        self.tolerance_s = tolerance_s
+        self.alpha = alpha
+        self.primary = next(iter(workers))
+        # moved here, in the thread that created the workers: moveToThread
+        # only works from an object's own thread, and run() is on another
+        self._threads = {}
+        for engine, worker in workers.items():
+            self._threads[engine] = QThread()
+            worker.moveToThread(self._threads[engine])
+        self._running = len(workers)
+        self.merger = SegmentMerger(tolerance_s)
+
+        # per-engine stats
+        self.latency_ms = {engine: None for engine in workers}
+        self.wins = {engine: 0 for engine in workers}
+        self.suppressed = {engine: 0 for engine in workers}
+
+    @property
+    def metrics(self):
+        return self  # the windows' health label reads ``metrics.summary()``
+
+    def _engine_of(self, worker):
+        for engine, w in self.workers.items():
+            if w is worker:
+                return engine
+        return None
+
+    # ==== Worker signals (delivered to this object's thread) ====
+    @pyqtSlot(str, str)
+    def _on_text(self, text, source):
+        engine = self._engine_of(self.sender())
+        if source.endswith("_final"):
+            return  # finals are taken from segment_ready, which carries the timestamp
+        if source.endswith("_interim"):
+            if engine == self.primary:
+                self.transcription_ready.emit(text, source)
+            return
+        self.transcription_ready.emit(text, source)  # status / errors pass through
+
+    @pyqtSlot(str, float, float, object)
+    def _on_segment(self, text, start_time, end_time, words):
+        engine = self._engine_of(self.sender())
+        latency = (time.monotonic() - end_time) * 1000
+        previous = self.latency_ms[engine]
+        self.latency_ms[engine] = latency if previous is None else previous + self.alpha * (latency - previous)
+        self._pick_primary()
+
+        text = self.merger.merge(text, start_time, end_time, words)
+        if text is None:
+            self.suppressed[engine] += 1  # another engine already delivered this audio
+            return
+        self.wins[engine] += 1
+        self.transcription_ready.emit(text, f"{engine}_final")
+
+    def _pick_primary(self):
+        measured = {e: l for e, l in self.latency_ms.items() if l is not None}
+        if measured:
+            self.primary = min(measured, key=measured.get)
+
+    @pyqtSlot()
+    def _on_worker_finished(self):
+        self._running -= 1
+        if self._running == 0:
+            self.transcription_ready.emit(f"[hedge] {self.summary()}", "hedge_status")
+            self.finished.emit()
+
+    # ==== Main Run ====
+    def run(self):
+        for engine, worker in self.workers.items():
+            thread = self._threads[engine]
+            thread.started.connect(worker.run)
+            worker.transcription_ready.connect(self._on_text)
+            worker.segment_ready.connect(self._on_segment)
+            worker.finished.connect(self._on_worker_finished)
+            # the child's own loop; quit is thread-safe, so no need to go through ours
+            worker.finished.connect(thread.quit, Qt.DirectConnection)
+            thread.start()
+
+        # serve the merge slots here until both engines are done; quit() of our
+        # thread (the windows call it right after stop()) ends this loop early
+        loop = QEventLoop()
+        self.finished.connect(loop.quit)
+        if self._running:
+            loop.exec_()
+
+        # stop() has joined the children by then, so their last signals are
+        # already posted to this thread: deliver them before run returns.
+        # Workers and threads are freed with this object, never while running.
+        self.stop()
+        QCoreApplication.sendPostedEvents()
+
+    def stop(self):
+        """Stop both engines and wait until they have sent their last results."""
+        for worker in self.workers.values():
+            worker.stop()
+        for thread in self._threads.values():
+            thread.wait()
+
+    def summary(self):
+        parts = [f"primary {self.primary}"]
+        for engine in self.workers:
+            latency = self.latency_ms[engine]
+            parts.append(f"{engine} {latency:.0f} ms" if latency is not None else f"{engine} -")
+            parts[-1] += f" ({self.wins[engine]} won, {self.suppressed[engine]} late)"
+        return " | ".join(parts)
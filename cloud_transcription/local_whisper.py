@@ -0,0 +1,203 @@
+# whisper_worker.py
+import os
+import threading
+import time
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+from dotenv import load_dotenv
+from cloud_transcription.ring_buffer import AudioRingBuffer
+from cloud_transcription.packetizer import Packetizer
+from cloud_transcription.capture_hub import capture_hub
+from cloud_transcription.resampler import StreamingResampler
+from cloud_transcription.vad import VoiceActivityGate
+from cloud_transcription.metrics import EngineMetrics, metrics_registry
+
+load_dotenv()
+
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+WHISPER_MODEL_DIR = os.getenv("WHISPER_MODEL_DIR")  # pre-downloaded checkpoints, so no network is needed
+WHISPER_RATE = 16000
+
+
+# ==== Shared models ====
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_model(name=WHISPER_MODEL):
+    """Load a Whisper checkpoint once per process and return ``(model, lock)``.
+
+    Whisper installs kv-cache hooks on the model while decoding, so windows
+    sharing a model take the lock around each ``transcribe`` call.
+    """
+    with _models_lock:
+        entry = _models.get(name)
+        if entry is None:
+            import whisper  # pulls in torch; only paid for when Engine 4 is used
+            print(f"[Whisper] Loading model '{name}' on CPU...")
+            model = whisper.load_model(name, device="cpu", download_root=WHISPER_MODEL_DIR)
+            entry = _models[name] = (model, threading.Lock())
+        return entry
+
+
+class WhisperTranscriptionWorker(QObject):
+    """Offline engine: streaming Whisper inference over a sliding window.
+
+    Audio is resampled to 16 kHz and appended to a window. Every ``step_s``
+    of new speech the window is re-decoded and emitted as an interim. A
+    pause (VAD) finalizes the whole window; a full window finalizes every
+    segment except the last ``keep_s``, which slides into the next window.
+    """
+    transcription_ready = pyqtSignal(str, str)  # text, source ("whisper_interim"/"whisper_final")
+    segment_ready = pyqtSignal(str, float, float, object)  # final text, capture-clock start/end, [(offset_s, segment)]
+    finished = pyqtSignal()
+
+    def __init__(self, device_index, rate=48000, lang="en-GB", role="Developer", channels=1,
+                 model_name=WHISPER_MODEL, step_s=1.0, max_window_s=12.0, keep_s=2.0, vad=True):
+        super().__init__()
+        self.device_index = device_index
+        self.rate = rate
+        self.lang = lang
+        self.language = lang.replace("_", "-").split("-")[0].lower()  # "en-GB" → "en"
+        self.role = role
+        self.channels = channels
+        self.model_name = model_name
+        self.model = None
+        self._running = True
+
+        self.ring = AudioRingBuffer(int(rate * 30), rate)  # absorbs inference that briefly runs slow
+        self.packetizer = Packetizer(self.ring, 250)
+        self.resampler = StreamingResampler(rate, WHISPER_RATE)
+        # a local engine has no session to keep alive, so silence is dropped outright
+        self.vad = VoiceActivityGate(WHISPER_RATE, keepalive_s=None) if vad is True else (vad or None)
+        self.metrics = EngineMetrics("whisper", role, self.ring, self.vad)
+
+        self.step = int(WHISPER_RATE * step_s)
+        self.max_window = int(WHISPER_RATE * max_window_s)
+        self.keep_s = keep_s
+        self._window = np.zeros(self.max_window + WHISPER_RATE, dtype=np.float32)
+        self._len = 0
+        self._since_decode = 0
+        self._end_time = None  # capture time of the newest sample in the window
+        self._context = ""  # tail of the last final, used as the decoding prompt
+
+    def _on_status(self, status):
+        self.transcription_ready.emit(f"[status] {status}", "whisper_status")
+
+    # ==== Window ====
+    def _append(self, samples):
+        n = len(samples)
+        if self._len + n > len(self._window):
+            self._decode(final=True)  # only if decoding fell far behind
+            samples = samples[-len(self._window):]
+            n = len(samples)
+        self._window[self._len:self._len + n] = samples
+        self._len += n
+        self._since_decode += n
+        self._end_time = self.packetizer.last_capture_time
+
+    def _drop(self, samples):
+        """Slide the window: forget the first ``samples`` samples."""
+        rest = self._len - samples
+        self._window[:rest] = self._window[samples:self._len]
+        self._len = rest
+
+    def _transcribe(self, audio):
+        model, lock = self.model
+        with lock:
+            result = model.transcribe(
+                audio,
+                language=self.language,
+                fp16=False,
+                condition_on_previous_text=False,
+                initial_prompt=self._context or None,
+            )
+        return result["segments"]
+
+    def _emit_final(self, segments, end_sample=None):
+        text = " ".join(s["text"].strip() for s in segments).strip()
+        if text:
+            self.transcription_ready.emit(text, "whisper_final")
+            window_start = (self._end_time or time.monotonic()) - self._len / WHISPER_RATE
+            end_time = window_start + (self._len if end_sample is None else end_sample) / WHISPER_RATE
+            first = segments[0]["start"]
+            offsets = [(s["start"] - first, s["text"].strip() + " ") for s in segments if s["text"].strip()]
+            self.segment_ready.emit(text, window_start + first, end_time, offsets)
+            self._context = text[-200:]
+
+    def _decode(self, final):
+        self._since_decode = 0
+        if not self._len:
+            return
+        segments = self._transcribe(self._window[:self._len])
+        if segments:
+            self.metrics.record_result()
+
+        if final:
+            self._emit_final(segments)
+            self._len = 0
+            return
+
+        if self._len >= self.max_window:
+            cut_time = self._len / WHISPER_RATE - self.keep_s
+            done = [s for s in segments if s["end"] <= cut_time]
+            if not done:
+                self._emit_final(segments)  # no segment boundary to cut at
+                self._len = 0
+                return
+            cut = min(self._len, int(done[-1]["end"] * WHISPER_RATE))
+            self._emit_final(done, cut)
+            self._drop(cut)
+            segments = segments[len(done):]
+
+        text = " ".join(s["text"].strip() for s in segments).strip()
+        if text:
+            self.transcription_ready.emit(text, "whisper_interim")
+
+    def _feed(self):
+        for data in self.packetizer:
+            audio = self.resampler.process(data)
+            packets = self.vad.process(audio) if self.vad else (audio,)
+            if not packets:
+                if self._len:
+                    self._decode(final=True)  # pause after speech closes the utterance
+                continue
+            for packet in packets:
+                self._append(packet)
+                self.metrics.record_send(packet.nbytes, self.packetizer.last_capture_time)
+
+            # interims are skipped while there is a backlog so inference catches up
+            caught_up = self.ring.available() < self.packetizer.packet_frames * 2
+            if self._len >= self.max_window or (caught_up and self._since_decode >= self.step):
+                self._decode(final=False)
+
+        self._decode(final=True)  # stopped: flush what is left
+
+    # ==== Main Run ====
+    def run(self):
+        try:
+            self.transcription_ready.emit(f"Loading Whisper model '{self.model_name}'...", "whisper_status")
+            self.model = get_model(self.model_name)
+            capture_hub.subscribe(self.device_index, self.ring, self.channels, self._on_status)
+            metrics_registry.register(f"whisper:{self.role}", self.metrics)
+            try:
+                self._feed()  # blocks until stopped
+            finally:
+                try:
+                    metrics_registry.dump_json(f"whisper_{self.role}", (f"whisper:{self.role}", f"device:{self.device_index}"))
+                except Exception as e:
+                    print(f"[Whisper] Could not write metrics: {e}")
+                metrics_registry.unregister(f"whisper:{self.role}")
+                capture_hub.unsubscribe(self.device_index, self.ring, self._on_status)
+
+        except Exception as e:
+            self.transcription_ready.emit(f"Error: {e}", "error")
+
+        if self.vad:
+            self.transcription_ready.emit(f"[vad] {self.vad.summary()}", "whisper_status")
+        self.finished.emit()
+
+    def stop(self):
+        self._running = False
+        # the packetizer drains the ring and ends the feed loop
+        self.ring.close()
@@ -0,0 +1,190 @@
+# metrics.py
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+
+METRICS_DIR = "metrics"
+
+# bucket upper bounds in milliseconds; the last bucket is open-ended
+INTERVAL_BUCKETS_MS = (1, 2, 4, 6, 8, 12, 16, 25, 50, 100, 250)
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 150, 200, 300, 500, 1000, 2000, 5000)
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``add`` is a bisect and an int increment."""
+
+    def __init__(self, edges):
+        self.edges = edges
+        self.counts = [0] * (len(edges) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.counts[bisect_left(self.edges, value)] += 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        """Upper bucket bound containing the q-th percentile (approximate)."""
+        if not self.total:
+            return None
+        target = q / 100 * self.total
+        seen = 0
+        for edge, count in zip(self.edges + (self.max,), self.counts):
+            seen += count
+            if seen >= target:
+                return edge
+        return self.max
+
+    def to_dict(self):
+        labels = [f"<={e}" for e in self.edges] + [f">{self.edges[-1]}"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.total,
+            "mean": self.sum / self.total if self.total else None,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class DeviceMetrics:
+    """Capture-side health of one shared input stream (updated in the callback)."""
+
+    def __init__(self, device_index, samplerate, blocksize):
+        self.device_index = device_index
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.callback_interval_ms = Histogram(INTERVAL_BUCKETS_MS)
+        self.callbacks = 0
+        self.input_overflows = 0
+        self.input_underflows = 0
+        self._last = None
+
+    def on_callback(self, status):
+        now = time.perf_counter()
+        if self._last is not None:
+            self.callback_interval_ms.add((now - self._last) * 1000)
+        self._last = now
+        self.callbacks += 1
+        if status:
+            if status.input_overflow:
+                self.input_overflows += 1
+            if status.input_underflow:
+                self.input_underflows += 1
+
+    def snapshot(self):
+        return {
+            "device": self.device_index,
+            "samplerate": self.samplerate,
+            "expected_interval_ms": 1000 * self.blocksize / self.samplerate,
+            "callbacks": self.callbacks,
+            "callback_interval_ms": self.callback_interval_ms.to_dict(),
+            "input_overflows": self.input_overflows,
+            "input_underflows": self.input_underflows,
+        }
+
+
+class EngineMetrics:
+    """Feeder-side health of one engine worker: ring, VAD and network send."""
+
+    def __init__(self, engine, role, ring, vad=None):
+        self.engine = engine
+        self.role = role
+        self.ring = ring
+        self.vad = vad
+        self.started = time.time()
+        self.bytes_sent = 0
+        self.packets_sent = 0
+        self.max_ring_frames = 0
+        self.capture_to_send_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.first_result_ms = None  # time from start to the first interim/final
+
+    def record_send(self, nbytes, capture_time=None):
+        """Call right after a packet went out; ``capture_time`` is monotonic."""
+        self.bytes_sent += nbytes
+        self.packets_sent += 1
+        occupancy = self.ring.available()
+        if occupancy > self.max_ring_frames:
+            self.max_ring_frames = occupancy
+        if capture_time is not None:
+            self.capture_to_send_ms.add((time.monotonic() - capture_time) * 1000)
+
+    def record_result(self):
+        if self.first_result_ms is None:
+            self.first_result_ms = (time.time() - self.started) * 1000
+
+    def snapshot(self):
+        ring = self.ring
+        elapsed = max(time.time() - self.started, 1e-6)
+        snap = {
+            "engine": self.engine,
+            "role": self.role,
+            "seconds": elapsed,
+            "bytes_sent": self.bytes_sent,
+            "packets_sent": self.packets_sent,
+            "kbps": self.bytes_sent * 8 / 1000 / elapsed,
+            "ring_occupancy": ring.available() / ring.capacity,
+            "max_ring_occupancy": self.max_ring_frames / ring.capacity,
+            "ring_overruns": ring.overruns,
+            "ring_dropped_frames": ring.dropped_frames,
+            "capture_to_send_ms": self.capture_to_send_ms.to_dict(),
+            "first_result_ms": self.first_result_ms,
+        }
+        if self.vad:
+            snap["vad_suppressed_fraction"] = self.vad.suppressed_fraction
+        return snap
+
+    def summary(self):
+        """One-line status for the UI."""
+        lat = self.capture_to_send_ms.percentile(50)
+        return (f"{self.engine}: ring {self.ring.available() / self.ring.capacity:.0%}"
+                f" | overruns {self.ring.overruns}"
+                f" | sent {self.bytes_sent / 1024:.0f} kB"
+                f" | capture→send p50 {lat if lat is not None else '-'} ms")
+
+
+class MetricsRegistry:
+    """Process-wide registry shared by every cloud_transcription worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items = {}
+
+    def register(self, key, metrics):
+        with self._lock:
+            self._items[key] = metrics
+
+    def unregister(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def get(self, key):
+        with self._lock:
+            return self._items.get(key)
+
+    def snapshot(self):
+        with self._lock:
+            items = list(self._items.items())
+        return {key: m.snapshot() for key, m in items}
+
+    def dump_json(self, name, keys=None):
+        """Write a snapshot (optionally only ``keys``) to metrics/<name>_<time>.json."""
+        snap = self.snapshot()
+        if keys is not None:
+            snap = {k: v for k, v in snap.items() if k in keys}
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = os.path.join(METRICS_DIR, f"{name}_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(snap, f, indent=4)
+        return path
+
+
+# Global instance
+metrics_registry = MetricsRegistry()
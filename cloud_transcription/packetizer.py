@@ -0,0 +1,88 @@
+# packetizer.py
+import time
+from bisect import bisect_left
+from collections import deque
+
+# Target packet duration per engine. gRPC/HTTP streams amortise framing well
+# over larger packets; XFYun's IAT protocol expects 40 ms (1280 bytes @16 kHz).
+DEFAULT_PACKET_MS = {
+    "gcp": 100,
+    "azure": 50,
+    "xfyun": 40,
+}
+
+
+class Packetizer:
+    """Coalesces small capture blocks from an AudioRingBuffer into packets.
+
+    A packet is emitted as soon as ``packet_ms`` of audio is readable. If the
+    capture side stalls, whatever is pending is flushed once it has waited
+    ``max_latency_ms`` so a short packet never sits in the ring forever.
+    """
+
+    def __init__(self, ring, packet_ms=100, max_latency_ms=None):
+        self.ring = ring
+        self.packet_ms = packet_ms
+        self.packet_frames = max(1, int(ring.samplerate * packet_ms / 1000))
+        self.max_latency = (max_latency_ms if max_latency_ms is not None else packet_ms * 1.5) / 1000
+        self._poll = min(0.005, packet_ms / 4000)
+
+        self.packets = 0
+        self.latency_flushes = 0  # short packets sent because of max_latency
+        self.last_capture_time = None  # monotonic capture time of the newest frame handed out
+
+    def next_packet(self):
+        """Return the next float32 packet, or None once the ring is closed and drained."""
+        pending_since = None
+        while True:
+            avail = self.ring.available()
+            if avail >= self.packet_frames:
+                return self._take(self.packet_frames)
+            if self.ring.closed:
+                return self._take(avail) if avail else None
+            if avail:
+                now = time.monotonic()
+                if pending_since is None:
+                    pending_since = now
+                elif now - pending_since >= self.max_latency:
+                    self.latency_flushes += 1
+                    return self._take(avail)
+            time.sleep(self._poll)
+
+    def _take(self, frames):
+        self.packets += 1
+        self.last_capture_time = self.ring.capture_time(self.ring.frames_read + frames - 1)
+        return self.ring.read(frames)
+
+    def __iter__(self):
+        while True:
+            packet = self.next_packet()
+            if packet is None:
+                return
+            yield packet
+
+
+class SendTimeline:
+    """Maps positions in the sent (VAD-gated, resampled) stream to capture time.
+
+    Engines time their results against the audio they were sent, which
+    skips suppressed silence. The feeder marks ``(samples sent so far,
+    capture time of the last one)`` after each packet; positions in between
+    are interpolated back from the next mark.
+    """
+
+    def __init__(self, rate, maxlen=8192):
+        self.rate = rate
+        self._marks = deque(maxlen=maxlen)  # ~13 min of 100 ms packets
+
+    def mark(self, position, capture_time):
+        if capture_time is not None:
+            self._marks.append((position, capture_time))
+
+    def capture_time(self, position):
+        """Monotonic capture time of sent position ``position`` (None before any mark)."""
+        marks = list(self._marks)
+        if not marks:
+            return None
+        pos, t = marks[min(bisect_left(marks, (position,)), len(marks) - 1)]
+        return t - (pos - position) / self.rate
@@ -1,58 +1,272 @@
 # recorder.py
-import sounddevice as sd
+import numpy as np
 import soundfile as sf
 import threading
+import time
+from cloud_transcription.capture_hub import capture_hub
+from cloud_transcription.ring_buffer import AudioRingBuffer
 
 # --- SETTINGS ---
-samplerate = 44100
+samplerate = 48000  # must match the transcription workers sharing the device
 channels = 1
-blocksize = 1024  # smaller chunks = smoother stop
+ring_seconds = 30   # how long a disk stall can be absorbed before frames drop
+batch_seconds = 1.0  # one large write per second instead of one per callback
+flush_seconds = 2.0  # a crash loses at most about this much audio
+sync_tolerance = 0.02  # re-align the two devices when they drift apart by 20 ms
 
-# Global stop event and threads
-stop_event = threading.Event()
-threads = []
+# container/codec per output format; both are encoded incrementally
+FORMATS = {
+    "flac": ("FLAC", "PCM_16"),
+    "opus": ("OGG", "OPUS"),
+    "wav": ("WAV", "PCM_16"),
+}
 
 
-def record_audio(device_index, filename):
-    print(f"[+] Recording from device {device_index} into {filename}")
-    with sf.SoundFile(filename, mode='w', samplerate=samplerate,
-                      channels=channels) as file:
-        def callback(indata, frames, time_info, status):
-            if status:
-                print(f"[!] Status for device {device_index}: {status}")
-            if not stop_event.is_set():
-                file.write(indata.copy())
-            else:
-                raise sd.CallbackStop()  # stop InputStream cleanly
+def _open_output(filename, fmt, nchannels):
+    container, subtype = FORMATS[fmt]
+    return sf.SoundFile(filename, mode='w', samplerate=samplerate,
+                        channels=nchannels, format=container, subtype=subtype)
 
-        with sd.InputStream(device=device_index,
-                            samplerate=samplerate,
-                            channels=channels,
-                            blocksize=blocksize,
-                            callback=callback):
-            stop_event.wait()  # keep stream alive until stop_event set
+
+class _BaseRecorder:
+    """Drains subscriber rings from a dedicated writer thread.
+
+    The capture callback only copies into preallocated rings; the writer
+    thread encodes in large batches and flushes every ``flush_seconds``.
+    Memory is fixed by ``ring_seconds`` no matter how long the recording runs.
+    """
+
+    def __init__(self, filename, fmt):
+        self.filename = filename
+        self.fmt = fmt
+        self.batch_frames = int(samplerate * batch_seconds)
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_flush = 0.0
+        self._started_at = None
+
+        # counters
+        self.input_overflows = 0  # PortAudio status flags reported to the callback
+        self.frames_written = 0
+        self.batches = 0
+        self.max_lag_frames = 0
+        self.max_write_seconds = 0.0
+
+    def _on_status(self, status):
+        self.input_overflows += 1
+        print(f"[!] Status while recording {self.filename}: {status}")
+
+    def start(self):
+        self._started_at = time.monotonic()
+        self._subscribe()
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._unsubscribe()
+        if self._thread:
+            self._thread.join()
+
+    def _writer(self):
+        with _open_output(self.filename, self.fmt, self.nchannels) as file:
+            self._last_flush = time.monotonic()
+            while True:
+                self._wait()
+                lag = self._pending()
+                self.max_lag_frames = max(self.max_lag_frames, lag)
+                if lag:
+                    t0 = time.perf_counter()
+                    written = self._write_batch(file, min(lag, self.batch_frames))
+                    self.max_write_seconds = max(self.max_write_seconds, time.perf_counter() - t0)
+                    self.frames_written += written
+                    self.batches += 1
+                    self._maybe_flush(file)
+                elif self._stop.is_set():
+                    break
+
+    def _maybe_flush(self, file):
+        now = time.monotonic()
+        if now - self._last_flush >= flush_seconds:
+            file.flush()  # push encoded frames to disk so a crash keeps them
+            self._last_flush = now
+
+    def stats(self):
+        rings = self._rings()
+        return {
+            "file": self.filename,
+            "seconds_written": self.frames_written / samplerate,
+            "batches": self.batches,
+            "writer_lag_seconds": max(r.available() for r in rings) / samplerate,
+            "max_writer_lag_seconds": self.max_lag_frames / samplerate,
+            "max_write_seconds": self.max_write_seconds,
+            "callback_overruns": sum(r.overruns for r in rings),
+            "dropped_frames": sum(r.dropped_frames for r in rings),
+            "input_overflows": self.input_overflows,
+        }
+
+
+class DeviceRecorder(_BaseRecorder):
+    """Records one shared input device to a mono file."""
+
+    nchannels = 1
+
+    def __init__(self, device_index, filename, fmt="flac"):
+        super().__init__(filename, fmt)
+        self.device_index = device_index
+        self.ring = AudioRingBuffer(samplerate * ring_seconds, samplerate)
+
+    def _rings(self):
+        return (self.ring,)
+
+    def _subscribe(self):
+        print(f"[+] Recording from device {self.device_index} into {self.filename}")
+        # share the device with any running transcription window
+        capture_hub.subscribe(self.device_index, self.ring, channels, self._on_status)
+
+    def _unsubscribe(self):
+        capture_hub.unsubscribe(self.device_index, self.ring, self._on_status)
+        self.ring.close()
+
+    def _wait(self):
+        self.ring.wait(self.batch_frames, timeout=batch_seconds * 2)
+
+    def _pending(self):
+        return self.ring.available()
+
+    def _write_batch(self, file, frames):
+        head, tail = self.ring.peek(frames)  # zero-copy views into the ring
+        file.write(head)
+        if len(tail):
+            file.write(tail)
+        self.ring.advance(frames)
+        return frames
+
+
+class StereoRecorder(_BaseRecorder):
+    """Interleaves two devices into one synchronized stereo file.
+
+    Left is ``device_left``, right is ``device_right``. The rings' capture
+    clocks are compared before every batch; if one side's next frame is more
+    than ``sync_tolerance`` older than the other's, the other side is padded
+    with silence. That aligns the two streams at start-up and keeps them
+    aligned as the two sound cards' clocks drift apart.
+    """
+
+    nchannels = 2
+
+    def __init__(self, device_left, device_right, filename, fmt="flac"):
+        super().__init__(filename, fmt)
+        self.devices = (device_left, device_right)
+        self.rings = tuple(AudioRingBuffer(samplerate * ring_seconds, samplerate) for _ in self.devices)
+        self._pad = [0, 0]  # silent frames still owed to each side
+        self._out = np.zeros((self.batch_frames, 2), dtype=np.float32)
+        self.sync_corrections = 0
+
+    def _rings(self):
+        return self.rings
+
+    def _subscribe(self):
+        print(f"[+] Recording devices {self.devices} into {self.filename}")
+        subscribed = []
+        try:
+            for device, ring in zip(self.devices, self.rings):
+                capture_hub.subscribe(device, ring, channels, self._on_status)
+                subscribed.append((device, ring))
+        except Exception:
+            # don't leave the first device open when the second one fails
+            for device, ring in subscribed:
+                capture_hub.unsubscribe(device, ring, self._on_status)
+            raise
+
+    def _unsubscribe(self):
+        for device, ring in zip(self.devices, self.rings):
+            capture_hub.unsubscribe(device, ring, self._on_status)
+            ring.close()
+
+    def _wait(self):
+        for ring in self.rings:
+            ring.wait(self.batch_frames, timeout=batch_seconds * 2)
+
+    def _available(self, side):
+        return self.rings[side].available() + self._pad[side]
+
+    def _pending(self):
+        if self._stop.is_set():
+            # drain: let the side that has more keep going against silence
+            return max(self._available(0), self._available(1))
+        self._resync()
+        return min(self._available(0), self._available(1))
+
+    def _resync(self):
+        now = time.monotonic()
+        for side, ring in enumerate(self.rings):
+            # a device that stopped delivering must not stall the other one
+            last = ring.last_write_time or self._started_at
+            stale = now - last > batch_seconds * 2
+            other = self._available(1 - side)
+            if stale and self._available(side) == 0 and other >= self.batch_frames:
+                self._pad[side] += other
+                return
+
+        times = []
+        for side, ring in enumerate(self.rings):
+            t = ring.capture_time(ring.frames_read)
+            if t is None:
+                return  # a device has not delivered anything yet
+            times.append(t - self._pad[side] / samplerate)
+        skew = times[1] - times[0]
+        if abs(skew) > sync_tolerance:
+            # the side whose next frame is later in time gets silence first
+            self._pad[1 if skew > 0 else 0] += int(round(abs(skew) * samplerate))
+            self.sync_corrections += 1
+
+    def _write_batch(self, file, frames):
+        out = self._out[:frames]
+        for side, ring in enumerate(self.rings):
+            pad = min(self._pad[side], frames)
+            out[:pad, side] = 0.0
+            self._pad[side] -= pad
+            take = min(frames - pad, ring.available())
+            head, tail = ring.peek(take)
+            out[pad:pad + len(head), side] = head
+            out[pad + len(head):pad + take, side] = tail
+            out[pad + take:, side] = 0.0  # only while draining after stop
+            ring.advance(take)
+        file.write(out)
+        return frames
+
+    def stats(self):
+        stats = super().stats()
+        stats["sync_corrections"] = self.sync_corrections
+        return stats
+
+
+# Active recorder
+recorder = None
 
 
 # Start recording (from API)
-def start_recording(device_index_1: int, device_index_4: int):
-    global threads, stop_event
-    if threads and any(t.is_alive() for t in threads):
+def start_recording(device_index_1: int, device_index_4: int, filename="conversation.flac", fmt="flac"):
+    global recorder
+    if recorder:
         print("⚠️ Recording already running")
         return
-    stop_event.clear()
-    t1 = threading.Thread(target=record_audio, args=(device_index_1, "mic1.wav"), daemon=True)
-    t2 = threading.Thread(target=record_audio, args=(device_index_4, "mic2.wav"), daemon=True)
-    threads = [t1, t2]
-    for t in threads:
-        t.start()
+    new_recorder = StereoRecorder(device_index_1, device_index_4, filename, fmt)
+    new_recorder.start()  # only a recorder that started counts as running
+    recorder = new_recorder
     print("[!] Recording started...")
 
 
 # Stop recording (from API)
 def stop_recording():
-    global threads, stop_event
-    stop_event.set()
-    for t in threads:
-        t.join()
-    threads.clear()
+    global recorder
+    if recorder:
+        recorder.stop()
+        print(f"[!] {recorder.stats()}")
+    recorder = None
     print("[!] Recording stopped.")
+
+
+def get_recording_stats():
+    return recorder.stats() if recorder else None
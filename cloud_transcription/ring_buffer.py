@@ -0,0 +1,141 @@
+# ring_buffer.py
+import time
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Preallocated single-producer/single-consumer float32 ring for mono audio.
+
+    The PortAudio callback is the only writer and one feeder thread is the only
+    reader. The producer only advances ``_written`` and the consumer only
+    advances ``_read``, so neither side needs a lock (int stores are atomic
+    under the GIL) and the callback never allocates sample memory.
+    """
+
+    def __init__(self, capacity, samplerate=48000):
+        self.capacity = int(capacity)
+        self.samplerate = samplerate
+        self._buf = np.zeros(self.capacity, dtype=np.float32)
+        self._written = 0   # total frames ever written (producer-owned)
+        self._read = 0      # total frames ever consumed (consumer-owned)
+        self._closed = False
+        # capture clock: monotonic time at which frame ``_written - 1`` arrived
+        self.last_write_time = None
+
+        # overrun accounting (producer-owned)
+        self.overruns = 0
+        self.dropped_frames = 0
+
+    # ==== Producer side (real-time callback) ====
+    def write(self, indata):
+        """Copy a block into the ring, down-mixing to mono in place.
+
+        Frames that do not fit are dropped and counted; the reader is never
+        overtaken so views it holds stay valid.
+        """
+        frames = len(indata)
+        free = self.capacity - (self._written - self._read)
+        if frames > free:
+            self.overruns += 1
+            self.dropped_frames += frames - free
+            frames = free
+            if frames <= 0:
+                self.last_write_time = time.monotonic()
+                return 0
+
+        start = self._written % self.capacity
+        first = min(frames, self.capacity - start)
+        self._copy_in(indata, 0, first, start)
+        if frames > first:
+            self._copy_in(indata, first, frames, 0)
+        self._written += frames
+        self.last_write_time = time.monotonic()
+        return frames
+
+    def _copy_in(self, indata, src_start, src_end, dst):
+        out = self._buf[dst:dst + (src_end - src_start)]
+        if indata.ndim > 1:
+            if indata.shape[1] == 1:
+                out[:] = indata[src_start:src_end, 0]
+            else:
+                np.mean(indata[src_start:src_end], axis=1, out=out)  # stereo → mono
+        else:
+            out[:] = indata[src_start:src_end]
+
+    # ==== Consumer side ====
+    @property
+    def frames_written(self):
+        return self._written
+
+    @property
+    def frames_read(self):
+        return self._read
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def available(self):
+        return self._written - self._read
+
+    def capture_time(self, frame_index):
+        """Estimated monotonic capture time of absolute frame ``frame_index``."""
+        t = self.last_write_time
+        if t is None:
+            return None
+        return t - (self._written - 1 - frame_index) / self.samplerate
+
+    def peek(self, max_frames=None):
+        """Return ``(head, tail)`` zero-copy views over the unread frames.
+
+        ``tail`` is empty unless the unread region wraps around the end of the
+        ring. The views stay valid until :meth:`advance` is called.
+        """
+        avail = self._written - self._read
+        if max_frames is not None:
+            avail = min(avail, max_frames)
+        start = self._read % self.capacity
+        first = min(avail, self.capacity - start)
+        return self._buf[start:start + first], self._buf[:avail - first]
+
+    def advance(self, frames):
+        self._read += min(frames, self._written - self._read)
+
+    def read(self, max_frames=None):
+        """Copy out and consume up to ``max_frames`` unread frames."""
+        head, tail = self.peek(max_frames)
+        data = np.concatenate((head, tail)) if len(tail) else head.copy()
+        self.advance(len(data))
+        return data
+
+    def wait(self, frames, timeout=None, poll=0.005):
+        """Block until ``frames`` are readable, the ring is closed or timeout.
+
+        Polls instead of using a Condition so the producer never has to take a
+        lock to wake us up.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._written - self._read < frames:
+            if self._closed:
+                return self._written - self._read > 0
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(poll)
+        return True
+
+    def close(self):
+        self._closed = True
+
+    def stats(self):
+        return {
+            "capacity": self.capacity,
+            "available": self.available(),
+            "frames_written": self._written,
+            "overruns": self.overruns,
+            "dropped_frames": self.dropped_frames,
+        }
+
+
+def to_pcm16(samples):
+    """float32 [-1, 1] → little-endian int16 PCM bytes."""
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
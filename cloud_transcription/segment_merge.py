@@ -0,0 +1,51 @@
+# segment_merge.py
+import re
+
+
+def estimate_words(text, start, end):
+    """``(offset_s, piece)`` pairs spread evenly over ``[start, end]``.
+
+    For engines that report no word timings. Pieces keep their trailing
+    whitespace so ``"".join`` gives ``text`` back; text without spaces
+    (Chinese, Japanese) is split per character.
+    """
+    pieces = re.findall(r"\S+\s*", text)
+    if len(pieces) <= 1:
+        pieces = list(text)
+    if not pieces:
+        return []
+    step = (end - start) / len(pieces)
+    return [(i * step, piece) for i, piece in enumerate(pieces)]
+
+
+class SegmentMerger:
+    """Keeps only the not-yet-delivered part of finals from several engines.
+
+    Each final covers ``[start, end]`` on the capture clock. A final that
+    ends inside what was already delivered (within ``tolerance_s``) is a
+    duplicate; one that starts before that point but ends after it is
+    trimmed to the words whose midpoint lies past it. ``words`` are
+    ``(offset from start in s, piece)`` pairs that join back to the text;
+    without them word positions are estimated evenly over the interval.
+    """
+
+    def __init__(self, tolerance_s=0.3):
+        self.tolerance_s = tolerance_s
+        self.covered_until = 0.0  # capture time up to which finals have been delivered
+
+    def merge(self, text, start, end, words=None):
+        """Return the text to deliver, or None if the final adds nothing."""
+        covered = self.covered_until
+        if end <= covered + self.tolerance_s:
+            return None
+        self.covered_until = end
+        if start >= covered - self.tolerance_s:
+            return text
+
+        words = words or estimate_words(text, start, end)
+        kept = []
+        for i, (offset, piece) in enumerate(words):
+            word_end = start + words[i + 1][0] if i + 1 < len(words) else end
+            if (start + offset + word_end) / 2 > covered:
+                kept.append(piece)
+        return "".join(kept).strip() or None
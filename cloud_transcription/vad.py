@@ -0,0 +1,152 @@
+# vad.py
+from collections import deque
+import numpy as np
+
+
+class EnergyZcrDetector:
+    """Frame-wise speech decision from RMS energy and zero-crossing rate.
+
+    The energy threshold follows an adaptive noise floor so a noisy room
+    does not hold the gate open. The floor is a low percentile of the frame
+    energies over the last ``history_s`` seconds (minimum statistics): it
+    follows a quieter room at once and rises by at most ``creep_db_s`` per
+    second, so steady noise is learned within seconds while the pauses
+    between words keep speech above it. The decision uses energy smoothed
+    over ``smooth_frames`` frames, so single-frame bumps of a rumble do not
+    open the gate. High-ZCR, low-energy frames (hiss, fans) are treated as
+    noise.
+    """
+
+    def __init__(self, rate, frame_ms=20, margin_db=10.0, min_db=-55.0, zcr_max=0.35,
+                 history_s=5.0, percentile=20, creep_db_s=6.0, smooth_frames=3):
+        self.rate = rate
+        self.frame_len = max(1, int(rate * frame_ms / 1000))
+        self.margin_db = margin_db
+        self.min_db = min_db
+        self.zcr_max = zcr_max
+        self.percentile = percentile
+        self.creep_db_s = creep_db_s
+        self.smooth_frames = smooth_frames
+        self.noise_db = min_db
+        self._tail = np.zeros(0)  # powers of the previous packet's last frames, for smoothing
+        self._history = deque(maxlen=max(1, int(history_s * 1000 / frame_ms)))  # frame energies, dB
+
+    def detect(self, samples):
+        """Return True if any whole frame of ``samples`` looks like speech."""
+        if len(samples) < 2:
+            return False  # too short to measure (no zero crossings to count)
+        n = len(samples) // self.frame_len
+        if n == 0:
+            frames = samples[np.newaxis, :]
+        else:
+            frames = samples[:n * self.frame_len].reshape(n, self.frame_len)
+
+        power = np.mean(frames * frames, axis=1)
+        energy_db = 10 * np.log10(power + 1e-10)
+        recent = np.concatenate([self._tail, power])
+        self._tail = recent[len(recent) - self.smooth_frames + 1:]
+        window = min(self.smooth_frames, len(recent))
+        smoothed = np.convolve(recent, np.ones(window) / window, mode="valid")[-len(power):]
+        smoothed_db = 10 * np.log10(smoothed + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+        threshold = max(self.min_db, self.noise_db + self.margin_db)
+        speech = (smoothed_db > threshold) & ((zcr < self.zcr_max) | (smoothed_db > threshold + 10))
+
+        # track the floor over all frames: down at once, up at creep_db_s
+        self._history.extend(energy_db.tolist())
+        level = float(np.percentile(self._history, self.percentile))
+        if level < self.noise_db:
+            self.noise_db = level
+        else:
+            self.noise_db += min(level - self.noise_db, self.creep_db_s * len(samples) / self.rate)
+        return bool(speech.any())
+
+
+class VoiceActivityGate:
+    """Drops silence between the capture ring and an engine feeder.
+
+    ``process(packet)`` returns the list of packets to send. A short
+    pre-roll of suppressed audio is replayed at each speech onset so the
+    first syllable is not clipped, a hangover keeps trailing words, and a
+    tiny frame of digital silence is sent every ``keepalive_s`` so the cloud
+    session does not time out during long pauses (``keepalive_s=None`` turns
+    keepalives off, e.g. for a local engine).
+    """
+
+    def __init__(self, rate, detector=None, preroll_ms=300, hangover_ms=600,
+                 keepalive_s=1.0, keepalive_ms=20):
+        self.rate = rate
+        self.detector = detector or EnergyZcrDetector(rate)
+        self.preroll_samples = int(rate * preroll_ms / 1000)
+        self.hangover_samples = int(rate * hangover_ms / 1000)
+        self.keepalive_samples = int(rate * keepalive_s) if keepalive_s else None
+        self._keepalive = np.zeros(max(1, int(rate * keepalive_ms / 1000)), dtype=np.float32)
+
+        self._preroll = deque()
+        self._preroll_len = 0
+        self._active = False
+        self._since_speech = 0  # samples since the last speech packet
+        self._since_sent = 0    # samples since anything was sent
+
+        # session stats, in samples
+        self.total_samples = 0
+        self.suppressed_samples = 0
+        self.keepalive_sent = 0
+
+    def process(self, packet):
+        n = len(packet)
+        self.total_samples += n
+
+        if self.detector.detect(packet):
+            out = []
+            if not self._active:
+                out.extend(self._preroll)
+                self.suppressed_samples -= self._preroll_len  # replayed after all
+                self._preroll.clear()
+                self._preroll_len = 0
+            out.append(packet)
+            self._active = True
+            self._since_speech = 0
+            self._since_sent = 0
+            return out
+
+        self._since_speech += n
+        if self._active and self._since_speech <= self.hangover_samples:
+            self._since_sent = 0
+            return [packet]
+
+        # silence: hold back as pre-roll, send only keepalives
+        self._active = False
+        self.suppressed_samples += n
+        self._preroll.append(packet)
+        self._preroll_len += n
+        while self._preroll and self._preroll_len - len(self._preroll[0]) >= self.preroll_samples:
+            self._preroll_len -= len(self._preroll.popleft())
+
+        self._since_sent += n
+        if self.keepalive_samples and self._since_sent >= self.keepalive_samples:
+            self._since_sent = 0
+            self.keepalive_sent += 1
+            return [self._keepalive]
+        return []
+
+    @property
+    def active(self):
+        """True while speech (or its hangover) is being passed through."""
+        return self._active
+
+    @property
+    def suppressed_fraction(self):
+        return self.suppressed_samples / self.total_samples if self.total_samples else 0.0
+
+    def summary(self):
+        return f"suppressed {self.suppressed_fraction:.1%} of {self.total_samples / self.rate:.0f}s audio"
+
+
+def make_gate(vad, rate):
+    """``True`` → default gate, falsy → no gate, anything else is used as the gate."""
+    if vad is True:
+        return VoiceActivityGate(rate)
+    return vad or None
@@ -0,0 +1,78 @@
+# xfyun_frames.py
+import base64
+import json
+import numpy as np
+
+FRAME_BYTES = 1280  # 40 ms of 16 kHz 16-bit mono, the size the IAT protocol expects
+_MARK = "\x00AUDIO\x00"
+
+
+def _template(frame):
+    """Serialize ``frame`` once and split it around the audio field."""
+    head, tail = json.dumps(frame).encode("utf-8").split(json.dumps(_MARK).encode("utf-8"))
+    return head + b'"', b'"' + tail
+
+
+class IatFrameEncoder:
+    """Turns float32 16 kHz audio into ready-to-send IAT websocket frames.
+
+    The status 0/1/2 frames are serialized once; per frame only the PCM is
+    converted and base64-encoded and spliced between a prebuilt head and
+    tail. Audio is re-cut into exact ``FRAME_BYTES`` frames; a remainder
+    waits in ``_pending`` for the next call (or :meth:`flush`).
+    """
+
+    def __init__(self, app_id, business, rate=16000):
+        fmt = f"audio/L16;rate={rate}"
+        self._first = _template({
+            "common": {"app_id": app_id},
+            "business": business,
+            "data": {"status": 0, "format": fmt, "encoding": "raw", "audio": _MARK},
+        })
+        self._audio = _template({
+            "data": {"status": 1, "format": fmt, "encoding": "raw", "audio": _MARK},
+        })
+        self.final_frame = json.dumps({
+            "data": {"status": 2, "format": fmt, "encoding": "raw", "audio": ""},
+        }).encode("utf-8")
+        self._pending = bytearray()
+        self._scratch = np.empty(FRAME_BYTES, dtype=np.float32)
+        self._pcm = np.empty(FRAME_BYTES, dtype="<i2")
+
+    def first_frame(self, pcm=b""):
+        """Status-0 handshake frame (carries the common/business parameters)."""
+        head, tail = self._first
+        return b"".join((head, base64.b64encode(pcm), tail))
+
+    def _frame(self, pcm):
+        head, tail = self._audio
+        return b"".join((head, base64.b64encode(pcm), tail))
+
+    def encode(self, samples):
+        """Return the complete status-1 frames that ``samples`` fill up."""
+        n = len(samples)
+        if n > len(self._scratch):
+            self._scratch = np.empty(n, dtype=np.float32)
+            self._pcm = np.empty(n, dtype="<i2")
+        scratch, out = self._scratch[:n], self._pcm[:n]
+        np.multiply(samples, 32767, out=scratch)
+        np.clip(scratch, -32767, 32767, out=scratch)
+        np.copyto(out, scratch, casting="unsafe")  # float → int16 without temporaries
+        pcm = out.tobytes()
+        if self._pending:
+            self._pending += pcm
+            pcm = bytes(self._pending)
+            self._pending.clear()
+        whole = len(pcm) - len(pcm) % FRAME_BYTES
+        if whole < len(pcm):
+            self._pending += pcm[whole:]
+        view = memoryview(pcm)
+        return [self._frame(view[i:i + FRAME_BYTES]) for i in range(0, whole, FRAME_BYTES)]
+
+    def flush(self):
+        """Emit the buffered remainder as a short frame (e.g. before a pause)."""
+        if not self._pending:
+            return []
+        frame = self._frame(bytes(self._pending))
+        self._pending.clear()
+        return [frame]
@@ -1,39 +1,59 @@
 from PyQt5.QtCore import QObject, pyqtSignal
 from dotenv import load_dotenv
-import os, traceback
-from openai import OpenAI
+import traceback
+from llm_stream import stream_completion
+from client_pool import client_pool
+from result_cache import result_cache, cache_key
 
 load_dotenv()
 
 class Translation_worker(QObject):
     translation_ready = pyqtSignal(str)   # translation or error
+    partial_ready = pyqtSignal(str)       # translation so far while streaming
     finished = pyqtSignal()               # always emitted at end
 
-    def __init__(self, text: str, target_language: str, prompt: str = None, model: str = "gpt-4o-mini"):
+    def __init__(self, text: str, target_language: str, prompt: str = None, model: str = "gpt-4o-mini",
+                 stream: bool = True):
         super().__init__()
         self.text = text
         self.target_language = target_language
         self.gpt_prompt = prompt
         self.gpt_model = model
+        self.stream = stream
+        self._running = True
+
+    def stop(self):
+        self._running = False
 
     def run(self):
         try:
-            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            key = cache_key("gpt_translate", self.gpt_model, self.gpt_prompt, self.target_language, self.text)
+            cached = result_cache.get(key)
+            if cached is not None:
+                self.translation_ready.emit(cached)
+                return
+
+            client = client_pool.get("openai")
 
             if self.gpt_prompt:
                 system_prompt = f"{self.gpt_prompt}\nAlways translate the text into {self.target_language} clearly and naturally."
             else:
                 system_prompt = f"You are a translation assistant. Translate all user text into {self.target_language} clearly and naturally."
 
-            response = client.chat.completions.create(
-                model=self.gpt_model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": self.text}
-                ]
-            )
-
-            translated_text = response.choices[0].message.content.strip()
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": self.text}
+            ]
+            if self.stream:
+                translated_text = stream_completion(client, self.partial_ready.emit, model=self.gpt_model, messages=messages,
+                                                    should_stop=lambda: not self._running).strip()
+                if not self._running:
+                    return  # cut short; don't cache or deliver a partial result
+            else:
+                response = client.chat.completions.create(model=self.gpt_model, messages=messages)
+                translated_text = (response.choices[0].message.content or "").strip()
+            if translated_text:
+                result_cache.put(key, translated_text)
             self.translation_ready.emit(translated_text)
 
         except Exception as e:
@@ -0,0 +1,141 @@
+# translation_batcher.py
+import traceback
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+from cloud_translation import Google_cloud_translation, azure_translation
+from job_executor import job_executor
+from result_cache import result_cache, cache_key
+
+# engine -> (cache name, provider module with translate_texts/MAX_TEXTS/MAX_CHARS)
+PROVIDERS = {
+    "Engine 1": ("google_translate", Google_cloud_translation),
+    "Engine 2": ("azure_translate", azure_translation),
+}
+
+
+class TranslationBatchJob(QObject):
+    """One multi-text request; a job for ``job_executor``."""
+    batch_ready = pyqtSignal(list)  # translations, same order and length as ``texts``
+
+    def __init__(self, provider, texts, target_language):
+        super().__init__()
+        self.provider = provider
+        self.texts = texts
+        self.target_language = target_language
+
+    def run(self):
+        try:
+            translated = self.provider.translate_texts(self.texts, self.target_language)
+            if len(translated) != len(self.texts):
+                raise ValueError(f"got {len(translated)} translations for {len(self.texts)} texts")
+        except Exception as e:
+            traceback.print_exc()
+            translated = [f"[Translation error] {e}"] + [""] * (len(self.texts) - 1)
+        self.batch_ready.emit(translated)
+
+
+class TranslationBatcher(QObject):
+    """Collects segments for Google/Azure translation and sends them as arrays.
+
+    Segments submitted within ``max_wait_ms`` of the first pending one go
+    out together, split to the provider's array and character limits; a
+    change of engine or target language flushes what is pending first.
+    Cached segments need no request. ``translation_ready`` fires once per
+    segment, in submission order, whichever request answers first.
+    """
+    translation_ready = pyqtSignal(str)
+
+    def __init__(self, max_wait_ms=300, parent=None):
+        super().__init__(parent)
+        self._pending = []   # (index, text) waiting for a flush
+        self._pending_key = None  # (engine, target language) of the pending segments
+        self._jobs = {}      # job -> (cache name, target language, indices, texts)
+        self._results = {}   # index -> translation, once known
+        self._next_index = 0
+        self._next_emit = 0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(max_wait_ms)
+        self._timer.timeout.connect(self.flush)
+
+        # stats
+        self.segments = 0
+        self.requests = 0
+        self.cached = 0
+
+    def submit(self, text, engine, target_language):
+        index = self._next_index
+        self._next_index += 1
+        self.segments += 1
+
+        cache_name = PROVIDERS[engine][0]
+        cached = result_cache.get(cache_key(cache_name, "", "", target_language, text))
+        if cached is not None:
+            self.cached += 1
+            self._results[index] = cached
+            self._emit_ready()
+            return
+
+        if self._pending and self._pending_key != (engine, target_language):
+            self.flush()
+        self._pending_key = (engine, target_language)
+        self._pending.append((index, text))
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        self._timer.stop()
+        if not self._pending:
+            return
+        engine, target_language = self._pending_key
+        cache_name, provider = PROVIDERS[engine]
+        pending, self._pending = self._pending, []
+
+        batch, chars = [], 0
+        for index, text in pending:
+            if batch and (len(batch) >= provider.MAX_TEXTS or chars + len(text) > provider.MAX_CHARS):
+                self._start(cache_name, provider, target_language, batch)
+                batch, chars = [], 0
+            batch.append((index, text))
+            chars += len(text)
+        self._start(cache_name, provider, target_language, batch)
+
+    def _start(self, cache_name, provider, target_language, batch):
+        indices = [index for index, _ in batch]
+        texts = [text for _, text in batch]
+        job = TranslationBatchJob(provider, texts, target_language)
+        job.batch_ready.connect(self._on_batch)
+        self._jobs[job] = (cache_name, target_language, indices, texts)
+        self.requests += 1
+        job_executor.submit(job)
+
+    @pyqtSlot(list)
+    def _on_batch(self, translated):
+        job = self._jobs.pop(self.sender(), None)
+        if job is None:
+            return  # cleared meanwhile
+        cache_name, target_language, indices, texts = job
+        failed = translated[0].startswith("[Translation error]")
+        for index, text, result in zip(indices, texts, translated):
+            self._results[index] = result
+            if result and not failed:
+                result_cache.put(cache_key(cache_name, "", "", target_language, text), result)
+        self._emit_ready()
+
+    def _emit_ready(self):
+        while self._next_emit in self._results:
+            result = self._results.pop(self._next_emit)
+            self._next_emit += 1
+            if result:
+                self.translation_ready.emit(result)
+
+    def clear(self):
+        """Forget pending and in-flight segments (window closed)."""
+        self._timer.stop()
+        self._pending.clear()
+        self._jobs.clear()
+        self._results.clear()
+        self._next_emit = self._next_index
+
+    def summary(self):
+        return f"{self.segments} segments in {self.requests} requests, {self.cached} cached"
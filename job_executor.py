@@ -0,0 +1,69 @@
+# job_executor.py
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+
+class JobExecutor(QObject):
+    """Fixed pool of long-lived threads for the windows' API jobs.
+
+    A job is a worker object (``Polished_text_worker``, the translation
+    workers, ``Question_extraction_worker``) created in the GUI thread with
+    its result signals already connected; :meth:`submit` calls its ``run``
+    on a pool thread. Signals emitted there reach the windows queued, as
+    they did from a per-request QThread, but no thread is created per
+    request and the API clients come from ``client_pool``, so connections
+    stay warm between jobs. The executor keeps each worker alive until its
+    ``run`` has returned and then releases it in the GUI thread.
+    """
+    _job_done = pyqtSignal(object)
+
+    def __init__(self, max_workers=4):
+        super().__init__()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = set()
+        self._job_done.connect(self._release)
+
+        # stats
+        self.submitted = 0
+        self.completed = 0
+
+    def submit(self, worker):
+        self._jobs.add(worker)
+        self.submitted += 1
+        self._pool.submit(self._run, worker)
+        return worker
+
+    def _run(self, worker):
+        try:
+            worker.run()
+        except Exception:
+            traceback.print_exc()  # workers report their own errors; this is a bug in one
+        finally:
+            self._job_done.emit(worker)
+
+    @pyqtSlot(object)
+    def _release(self, worker):
+        self._jobs.discard(worker)
+        self.completed += 1
+
+    @property
+    def pending(self):
+        return len(self._jobs)
+
+    def shutdown(self):
+        """Drop queued jobs and ask running ones to stop.
+
+        Pool threads are joined when the interpreter exits, so a running job
+        holds up the close until it returns: workers with ``stop()`` end a
+        streaming reply at the next chunk, anything else (a plain request)
+        runs until its reply or the client's timeout.
+        """
+        for worker in list(self._jobs):
+            if hasattr(worker, "stop"):
+                worker.stop()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Global instance
+job_executor = JobExecutor()
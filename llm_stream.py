@@ -0,0 +1,39 @@
+# llm_stream.py
+import os
+import time
+from openai import OpenAI
+from dotenv import load_dotenv
+from client_pool import client_pool
+
+load_dotenv()
+
+# one keep-alive client for every polishing/translation/extraction job
+client_pool.register("openai", lambda: OpenAI(api_key=os.getenv("OPENAI_API_KEY")))
+
+
+def stream_completion(client, on_partial, min_interval=0.05, should_stop=None, **kwargs):
+    """Run ``chat.completions.create`` with ``stream=True`` and return the full text.
+
+    ``on_partial(text_so_far)`` is called as tokens arrive, at most every
+    ``min_interval`` seconds, so a fast stream does not flood the GUI.
+    If ``should_stop()`` turns true the stream is closed and the text so
+    far is returned.
+    """
+    parts = []
+    last = 0.0
+    stream = client.chat.completions.create(stream=True, **kwargs)
+    for chunk in stream:
+        if should_stop and should_stop():
+            stream.close()
+            break
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        parts.append(delta)
+        now = time.monotonic()
+        if now - last >= min_interval:
+            last = now
+            on_partial("".join(parts))
+    return "".join(parts)
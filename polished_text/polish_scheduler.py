@@ -0,0 +1,165 @@
+# polish_scheduler.py
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+from job_executor import job_executor
+from result_cache import result_cache
+
+_IN_BATCH = object()  # result slot of a segment sent with an earlier one's batch
+
+
+class PolishScheduler(QObject):
+    """Queues final segments for polishing and sends them in batches.
+
+    When no request is in flight the pending segments go out at once as one
+    batch. Segments that arrive while one is in flight wait and are
+    coalesced into the next batch; a batch that fills up (``max_segments``
+    or ``max_chars``) or has waited ``max_wait_ms`` is sent alongside, up to
+    ``max_in_flight`` requests. Results are emitted in submission order;
+    a streaming worker's partial text is forwarded only for the batch that
+    is next in line, so ``partial_ready`` always refers to the text that the
+    next ``polished_ready`` will replace.
+
+    ``make_worker(text)`` builds a ``Polished_text_worker``-like object (a
+    QObject with ``text_ready(str)`` and ``run``); it is called when the batch
+    is sent, so it picks up the window's current prompt and model. Batches
+    run on the shared ``job_executor``.
+
+    ``make_key(text)``, if given, is the cache key a single segment would be
+    polished under; segments found in ``result_cache`` are emitted in their
+    place without a request. A worker caches under its whole batch text, so
+    only segments that went out alone are stored for later lookups.
+    """
+    polished_ready = pyqtSignal(str)
+    partial_ready = pyqtSignal(str)
+
+    def __init__(self, make_worker, make_key=None, max_segments=8, max_chars=1200, max_wait_ms=1500,
+                 max_in_flight=2, parent=None):
+        super().__init__(parent)
+        self.make_worker = make_worker
+        self.make_key = make_key
+        self.max_segments = max_segments
+        self.max_chars = max_chars
+        self.max_wait_ms = max_wait_ms
+        self.max_in_flight = max_in_flight
+
+        self._pending = []       # (slot, text) not yet sent
+        self._pending_since = None
+        self._jobs = {}          # worker -> slots of its segments
+        self._results = {}       # slot -> polished text, or None while in flight
+        self._partials = {}      # first slot of a batch -> streamed text so far
+        self._next_id = 0
+        self._next_emit = 0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(lambda: self._dispatch(force=True))
+
+        # stats
+        self.segments = 0
+        self.batches = 0
+        self.cached = 0
+
+    @pyqtSlot(str)
+    def submit(self, text):
+        slot = self._next_id
+        self._next_id += 1
+        self.segments += 1
+
+        cached = result_cache.get(self.make_key(text)) if self.make_key else None
+        if cached is not None:
+            self.cached += 1
+            self._results[slot] = cached
+            self._emit_ready()
+            return
+
+        if not self._pending:
+            self._pending_since = time.monotonic()
+        self._pending.append((slot, text))
+        self._dispatch()
+
+    def _full(self):
+        return (len(self._pending) >= self.max_segments
+                or sum(len(t) for _, t in self._pending) >= self.max_chars)
+
+    def _take_batch(self):
+        batch, chars = [], 0
+        while self._pending and len(batch) < self.max_segments:
+            slot, text = self._pending[0]
+            if batch and (chars + len(text) > self.max_chars or slot != batch[-1][0] + 1):
+                break  # full, or a cached segment sits in between and must keep its place
+            chars += len(text)
+            batch.append(self._pending.pop(0))
+        return batch
+
+    def _dispatch(self, force=False):
+        while self._pending and len(self._jobs) < self.max_in_flight:
+            if self._jobs and not (force or self._full()):
+                break  # let it collect behind the request in flight
+            self._start(self._take_batch())
+            force = False
+            self._pending_since = time.monotonic() if self._pending else None
+
+        if self._pending:
+            waited = (time.monotonic() - self._pending_since) * 1000
+            self._timer.start(max(0, int(self.max_wait_ms - waited)))
+        else:
+            self._timer.stop()
+
+    def _start(self, batch):
+        slots = [slot for slot, _ in batch]
+        for slot in slots:
+            self._results[slot] = None
+        self.batches += 1
+
+        worker = self.make_worker(" ".join(text for _, text in batch))
+        worker.text_ready.connect(self._on_done)
+        if hasattr(worker, "partial_ready"):
+            worker.partial_ready.connect(self._on_partial)
+        self._jobs[worker] = slots
+        job_executor.submit(worker)
+
+    @pyqtSlot(str)
+    def _on_partial(self, text):
+        slots = self._jobs.get(self.sender())
+        if slots is None:
+            return
+        self._partials[slots[0]] = text
+        if slots[0] == self._next_emit:
+            self.partial_ready.emit(text)
+
+    @pyqtSlot(str)
+    def _on_done(self, result):
+        slots = self._jobs.pop(self.sender(), None)
+        if slots is None:
+            return  # stopped meanwhile
+        self._results[slots[0]] = result
+        for slot in slots[1:]:
+            self._results[slot] = _IN_BATCH
+        self._emit_ready()
+        self._dispatch()
+
+    def _emit_ready(self):
+        # emit in order: a faster later batch or a cached segment waits for the one before it
+        while self._results.get(self._next_emit) is not None:
+            self._partials.pop(self._next_emit, None)
+            result = self._results.pop(self._next_emit)
+            self._next_emit += 1
+            if result is not _IN_BATCH:
+                self.polished_ready.emit(result)
+        if self._next_emit in self._partials:
+            self.partial_ready.emit(self._partials[self._next_emit])  # next batch was already streaming
+
+    def stop(self):
+        """Drop pending segments and abandon the requests in flight."""
+        self._timer.stop()
+        self._pending.clear()
+        for worker in self._jobs:
+            if hasattr(worker, "stop"):
+                worker.stop()  # a request already sent still finishes, its result is ignored
+        self._jobs.clear()
+        self._results.clear()
+        self._partials.clear()
+        self._next_emit = self._next_id
+
+    def summary(self):
+        return f"{self.segments} segments in {self.batches} batches, {self.cached} cached"
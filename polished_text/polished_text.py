@@ -1,16 +1,22 @@
 from PyQt5.QtCore import QObject, pyqtSignal
 from dotenv import load_dotenv
-import os
-from openai import OpenAI
+from llm_stream import stream_completion
+from client_pool import client_pool
+from result_cache import result_cache, cache_key
 load_dotenv()
 
+def polish_cache_key(text, prompt, model):
+    return cache_key("polish", model, prompt, "", text)
+
 class Polished_text_worker(QObject):
     text_ready=pyqtSignal(str)
-    def __init__(self,text:str,prompt:str,model="gpt-4o-mini"):
+    partial_ready=pyqtSignal(str)  # text so far while streaming
+    def __init__(self,text:str,prompt:str,model="gpt-4o-mini",stream=True):
         super().__init__()
         self.raw_text=text
         self.prompt=prompt
         self.gpt_model=model
+        self.stream=stream
         self._running = True
     def stop(self):
         self._running = False
@@ -18,7 +24,13 @@ class Polished_text_worker(QObject):
         if not self._running:
             return
         try:
-            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            key = polish_cache_key(self.raw_text, self.prompt, self.gpt_model)
+            cached = result_cache.get(key)
+            if cached is not None:
+                self.text_ready.emit(cached)
+                return
+
+            client = client_pool.get("openai")
             system_prompt = (
                 "You are a text editor. "
                 "Your only job is to transform the given text according to instructions. "
@@ -26,14 +38,20 @@ class Polished_text_worker(QObject):
                 "return it unchanged. "
                 "Never refuse, never explain, never add anything outside the edited text."
             )
-            response = client.chat.completions.create(
-                model=self.gpt_model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Instruction: {self.prompt}\nText: {self.raw_text}"}
-                ]
-            )
-            polished_text = response.choices[0].message.content
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"Instruction: {self.prompt}\nText: {self.raw_text}"}
+            ]
+            if self.stream:
+                polished_text = stream_completion(client, self.partial_ready.emit, model=self.gpt_model, messages=messages,
+                                                  should_stop=lambda: not self._running)
+                if not self._running:
+                    return  # cut short; don't cache or deliver a partial result
+            else:
+                response = client.chat.completions.create(model=self.gpt_model, messages=messages)
+                polished_text = response.choices[0].message.content or ""
+            if polished_text:
+                result_cache.put(key, polished_text)
             self.text_ready.emit(polished_text)
         except Exception as e:
             self.text_ready.emit(f"Error polishing text: {e}")
@@ -0,0 +1,138 @@
+# result_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_DIR = "cache"
+CACHE_DB = os.path.join(CACHE_DIR, "results.sqlite")
+
+
+def normalize(text):
+    """Collapse whitespace so re-spaced repeats of a segment share an entry."""
+    return " ".join(text.split())
+
+
+def cache_key(engine, model, prompt, target, text):
+    raw = json.dumps([engine, model or "", normalize(prompt or ""), target or "", normalize(text)],
+                     ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Content-addressed cache for polishing and translation results.
+
+    Keys hash (engine/model, prompt, target language, normalized text).
+    Lookups hit an in-memory LRU first, then SQLite on disk, which survives
+    restarts; the disk tier is trimmed to ``max_disk_bytes`` by dropping
+    the least recently used rows. Thread-safe, since jobs run on the pool.
+    """
+
+    def __init__(self, path=CACHE_DB, max_memory_items=2048, max_disk_bytes=32 * 1024 * 1024):
+        self.path = path
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._db = None  # opened on first use
+        self._disk_bytes = None
+
+        # stats
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def _conn(self):
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+            self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        return self._db
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+            try:
+                db = self._conn()
+                row = db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    db.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+                    db.commit()
+            except sqlite3.Error as e:
+                print(f"[ResultCache] Disk lookup failed: {e}")
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+            size = len(key) + len(value.encode("utf-8"))
+            try:
+                db = self._conn()
+                old = db.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+                db.execute("INSERT OR REPLACE INTO results (key, value, size, used) VALUES (?, ?, ?, ?)",
+                           (key, value, size, time.time()))
+                self._disk_bytes += size - (old[0] if old else 0)
+                if self._disk_bytes > self.max_disk_bytes:
+                    self._evict(db)
+                db.commit()
+            except sqlite3.Error as e:
+                print(f"[ResultCache] Disk write failed: {e}")
+
+    def _evict(self, db):
+        """Drop least recently used rows until the disk tier is at 90% of its limit."""
+        target = self.max_disk_bytes * 0.9
+        rows = db.execute("SELECT key, size FROM results ORDER BY used").fetchall()
+        doomed = []
+        for key, size in rows:
+            if self._disk_bytes <= target:
+                break
+            doomed.append((key,))
+            self._disk_bytes -= size
+        db.executemany("DELETE FROM results WHERE key = ?", doomed)
+        self.evicted += len(doomed)
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_items": len(self._memory),
+            "disk_bytes": self._disk_bytes or 0,
+            "evicted": self.evicted,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"cache {s['hit_rate']:.0%} hits ({s['memory_hits']} mem, {s['disk_hits']} disk, "
+                f"{s['misses']} miss)")
+
+
+# Global instance
+result_cache = ResultCache()
@@ -11,9 +11,16 @@ from ui.themes import dark_theme,light_theme,get_stylesheet,LANGUAGE_CODES,DIALE
 from cloud_transcription.cloud_google import GCPTranscriptionWorker
 from cloud_transcription.cloud_azure import AzureTranscriptionWorker
 from cloud_transcription.cloud_xfyun import XFYunTranscriptionWorker
-from polished_text.polished_text import Polished_text_worker
-from cloud_translation.Google_cloud_translation import Google_translation_worker
-from cloud_translation.azure_translation import Azure_translation_worker
+from cloud_transcription.local_whisper import WhisperTranscriptionWorker
+from cloud_transcription.hedging import create_transcription_worker, HEDGED_ENGINES
+from ui.interim_coalescer import InterimCoalescer
+from ui.transcript_view import TranscriptView, InlineTail
+from transcript_store import transcript_store
+from transcript_sync import transcript_sync
+from job_executor import job_executor
+from polished_text.polished_text import Polished_text_worker, polish_cache_key
+from polished_text.polish_scheduler import PolishScheduler
+from cloud_translation.translation_batcher import TranslationBatcher, PROVIDERS as TRANSLATION_PROVIDERS
 from cloud_translation.gpt_translation import Translation_worker
 #from Langchain_workers.manuel_langchain import LangChainWorker
 import requests
@@ -112,6 +119,17 @@ class SettingsWindow(QWidget):
         layout.addWidget(self.italic_toggle)
         self.italic_toggle.stateChanged.connect(lambda s: self.settings_manager.set_setting("italic", bool(s)))
 
+        # Transcript view length (Windows 1/4); 0 keeps every line on screen
+        self.max_blocks_spin = QSpinBox()
+        self.max_blocks_spin.setRange(0, 100000)
+        self.max_blocks_spin.setSingleStep(500)
+        self.max_blocks_spin.setSpecialValueText("Unlimited")
+        self.max_blocks_spin.setValue(self.settings_manager.get("transcript_max_blocks", 0))
+        self.max_blocks_name=QLabel("Transcript Lines On Screen")
+        layout.addWidget(self.max_blocks_name)
+        layout.addWidget(self.max_blocks_spin)
+        self.max_blocks_spin.valueChanged.connect(lambda v: self.settings_manager.set_setting("transcript_max_blocks", v))
+
         # Text Color Picker
         self.color_btn = QPushButton("Choose Text Color")
         self.color_btn.clicked.connect(self.choose_text_color)
@@ -251,6 +269,8 @@ class SettingsWindow(QWidget):
         self.font_size_name.setFont(font)
         self.font_family.setFont(font)
         self.font_weight_name.setFont(font)
+        self.max_blocks_spin.setFont(font)
+        self.max_blocks_name.setFont(font)
 
 # ----------------- Dummy Feature Windows -----------------
 class ClickableTextEdit(QTextEdit):
@@ -414,8 +434,8 @@ class FeatureWindow8(QWidget):
                 data = resp.json()
                 self.summary_task_id = data.get("task_id")
 
-                # Poll every 2 seconds for summary
-                self.summary_poll_timer.start(2000)
+                # Poll twice a second; the summary streams in as it is generated
+                self.summary_poll_timer.start(500)
 
             except Exception as e:
                 self.summary_box.setText("❌ FAST API server not started")
@@ -459,6 +479,9 @@ class FeatureWindow8(QWidget):
                 self.summary_poll_timer.stop()
                 self.summary_task_id = None
                 self.summary_running = False
+            elif data.get("partial") and data["partial"] != self.summary_box.toPlainText():
+                self.animation_timer.stop()
+                self.summary_box.setText(data["partial"])
 
         except Exception as e:
             self.animation_timer.stop()
@@ -1068,20 +1091,11 @@ class FeatureWindow7B(QWidget):
     def generte_Questions(self, _=None):
         # create worker to extract questions
         prompt = self.text_box.toPlainText()
-        self.worker_thread = QThread()
         selected_front_name = self.model_dropdown.currentText()
         model_name = GPT_Models.get(selected_front_name, selected_front_name)
         self.worker = Question_extraction_worker(prompt, model_name)
-        self.worker.moveToThread(self.worker_thread)
-
-        self.worker_thread.started.connect(self.worker.run)
         self.worker.text_ready.connect(self.update_generated_question)
-        # cleanup
-        self.worker.text_ready.connect(self.worker_thread.quit)
-        self.worker.text_ready.connect(self.worker.deleteLater)
-        self.worker_thread.finished.connect(self.worker_thread.deleteLater)
-
-        self.worker_thread.start()
+        job_executor.submit(self.worker)
 
     def start_query_api(self, query=None):
         # start a server-side query (do not block here)
@@ -1405,7 +1419,7 @@ class FeatureWindow6(QWidget):
         self.setWindowTitle("Window 6 for Translation")
         self.setGeometry(200, 200, 600, 500)
         self.settings_manager = settings_manager
-        self.accumulated_text=" "
+        self.transcript = transcript_store.channel("window6")
 
         # Main vertical layout
         main_layout = QVBoxLayout()
@@ -1451,6 +1465,9 @@ class FeatureWindow6(QWidget):
         self.mic_box = QTextEdit()
         self.mic_box.setReadOnly(True)
         self.mic_box.setPlaceholderText(f"Translated Text in {self.language_dropdown.currentText()}")
+        self.translation_tail = InlineTail(self.mic_box)
+        self.batcher = TranslationBatcher(parent=self)
+        self.batcher.translation_ready.connect(self.update_translation_area)
         main_layout.addWidget(self.mic_box)
         self.language_dropdown.currentTextChanged.connect(
             lambda lang: self.mic_box.setPlaceholderText(f"Translated Text in ({lang})"))
@@ -1465,7 +1482,6 @@ class FeatureWindow6(QWidget):
         
         # Set final layout
         self.setLayout(main_layout)
-        self.worker_thread = None
         self.worker = None
     @pyqtSlot(str)
     def handle_new_text(self, text: str):
@@ -1575,67 +1591,43 @@ class FeatureWindow6(QWidget):
         if not text or not text.strip():
             print("[W3] start_translation: empty text -> skipping")
             return
-        if getattr(self, "busy", False):
-            print("[W6] Translation already running, skipping new request.")
-            return
-        self.busy = True
-
         target_language = self.language_dropdown.currentData() or self.language_dropdown.currentText()
         selected_engine = self.engine_dropdown.currentText()
 
-        # Safely stop previous worker/thread if running
-        if getattr(self, "worker_thread", None) is not None:
-            try:
-                # ask thread to quit and wait shortly
-                self.worker_thread.quit()
-                self.worker_thread.wait(1000)
-            except Exception:
-                pass
-            finally:
-                self.worker_thread = None
-                self.worker = None
-
-        # Create new worker + thread
-        self.worker_thread = QThread()
-        if selected_engine == "Engine 1":
-
-            self.worker = Google_translation_worker(text, target_language)
-            self.worker.translation_ready.connect(self.update_translation_area)
-
-        elif selected_engine == "Engine 2":
-            self.worker = Azure_translation_worker(text, target_language)
-            self.worker.translation_ready.connect(self.update_translation_area)
+        if selected_engine in TRANSLATION_PROVIDERS:
+            # Google/Azure: queued and sent as multi-text requests, nothing is skipped
+            self.batcher.submit(text, selected_engine, target_language)
+            return
 
-        elif selected_engine == "Engine 3":
-            #prompt = self.text_box.toPlainText()
-            prompt=self.text_box.toPlainText().strip()
-            self.worker=Translation_worker(text,target_language,prompt)
-            self.worker.translation_ready.connect(self.update_translation_area)
+        if getattr(self, "busy", False):
+            print("[W6] Translation already running, skipping new request.")
+            return
+        self.busy = True
 
-        self.worker.moveToThread(self.worker_thread)
+        prompt=self.text_box.toPlainText().strip()
+        self.worker=Translation_worker(text,target_language,prompt)
+        self.worker.partial_ready.connect(self.update_translation_partial)
 
-        # Normal flow: when thread starts, call run()
+        self.worker.translation_ready.connect(self.update_translation_area)
         self.worker.translation_ready.connect(lambda _: setattr(self, "busy", False))
-        self.worker_thread.started.connect(self.worker.run)
 
+        # runs on the shared job pool; results arrive through the signals above
+        job_executor.submit(self.worker)
 
-        # Always ensure thread quits and worker gets deleted when worker signals finished
-        if hasattr(self.worker, "finished"):
-            self.worker.finished.connect(self.worker_thread.quit)
-            self.worker.finished.connect(self.worker.deleteLater)
-            self.worker_thread.finished.connect(self.worker_thread.deleteLater)
-
-        # Start thread
-        self.worker_thread.start()
 
+    def update_translation_partial(self, partial_text: str):
+        """Show a GPT translation while it streams in."""
+        scrollbar = self.mic_box.verticalScrollBar()
+        distance_from_bottom = scrollbar.maximum() - scrollbar.value()
+        self.translation_tail.set_partial(partial_text)
+        scrollbar.setValue(scrollbar.maximum() - distance_from_bottom)
 
     def update_translation_area(self, translated_text: str):
         scrollbar = self.mic_box.verticalScrollBar()
     # Save distance from bottom
         distance_from_bottom = scrollbar.maximum() - scrollbar.value()
-        self.accumulated_text+=" "+translated_text
-
-        self.mic_box.setPlainText(self.accumulated_text)
+        self.transcript.append(translated_text, "translation")
+        self.translation_tail.commit(translated_text)  # replaces the streamed partial, if any
 
         # Restore scroll relative to bottom
         scrollbar.setValue(scrollbar.maximum() - distance_from_bottom)
@@ -1647,20 +1639,14 @@ class FeatureWindow6(QWidget):
             except Exception:
                 pass
 
-        if getattr(self, "worker_thread", None) is not None:
-            try:
-                self.worker_thread.quit()
-                self.worker_thread.wait(1000)
-            except Exception as e:
-                print(f"[W3] Error stopping worker thread: {e}")
-            finally:
-                self.worker_thread = None
-                self.worker = None
+        self.worker = None
+        self.batcher.clear()
         self.mic_box.setPlainText("")
+        self.transcript = transcript_store.reset("window6")  # save writes what the view shows
         self.save_window_geometry()
         super().closeEvent(event)
     def save_polished(self):
-        if not self.accumulated_text.strip():
+        if not len(self.transcript):
             self.mic_box.append("⚠️ No Transaltion to save.")
             return
 
@@ -1668,7 +1654,7 @@ class FeatureWindow6(QWidget):
         if file_path:
             try:
                 with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(self.mic_box.toPlainText())
+                    f.write(self.transcript.text())
                 self.mic_box.append(f"✅ Translated Text saved to {file_path}")
             except Exception as e:
                 self.mic_box.append(f"❌ Error saving Translated Text: {e}")
@@ -1682,7 +1668,10 @@ class FeatureWindow5(QWidget):
         self.latest_text = ""
         self.last_sent_text = ""
         self.last_polished_text = ""
-        self.accumulated_text=" "
+        self.transcript = transcript_store.channel("window5")
+        self.polisher = PolishScheduler(self.make_polish_worker, self.polish_key, parent=self)
+        self.polisher.polished_ready.connect(self.update_translation_area)
+        self.polisher.partial_ready.connect(self.update_polish_partial)
         # Main vertical layout (everything stacks vertically)
         main_layout = QVBoxLayout()
 
@@ -1720,6 +1709,7 @@ class FeatureWindow5(QWidget):
         self.translation_area = QTextEdit()
         self.translation_area.setReadOnly(True)
         self.translation_area.setPlaceholderText("Polished text will appear here...")
+        self.polish_tail = InlineTail(self.translation_area)
         main_layout.addWidget(self.translation_area, stretch=1)
 
         self.download_transcript_btn = QPushButton("Download Polished Text")
@@ -1735,10 +1725,12 @@ class FeatureWindow5(QWidget):
             self.btn_onoff.setText("ON")
             self.btn_onoff.setStyleSheet("background-color: green; font-weight: bold;")
             WINDOW5_ACTIVE = True
+            transcript_sync.set_active("window5")  # backend readers follow the polished text
         else:
             self.btn_onoff.setText("OFF")
             self.btn_onoff.setStyleSheet("")
             WINDOW5_ACTIVE = False
+            transcript_sync.set_active("window4")
     def receive_text(self, text: str):
         """Called from Window 4 signal"""
         if not self.btn_onoff.isChecked():  
@@ -1758,53 +1750,41 @@ class FeatureWindow5(QWidget):
             self.start_polish(self.latest_text)
 
     def start_polish(self, text: str):
-    # avoid overlapping polish requests
-        if getattr(self, "is_polishing", False):
-            return
-        self.is_polishing = True
+        # queued and batched; segments arriving while a request runs are not dropped
+        self.polisher.submit(text)
 
-        prompt = self.text_box.toPlainText()
-
-        # Create worker + thread
-        self.worker_thread = QThread()
+    def make_polish_worker(self, text: str):
         selected_front_name = self.engine_dropdown.currentText()
         model_name = GPT_Models.get(selected_front_name, selected_front_name)
-        self.worker = Polished_text_worker(text, prompt, model_name)
-        self.worker.moveToThread(self.worker_thread)
-
-        # Run when thread starts
-        self.worker_thread.started.connect(self.worker.run)
-
-        # On result
-        def on_done(result_text: str):
-            self.is_polishing = False
-            self.update_translation_area(result_text)
-            self.worker_thread.quit()
-            self.worker_thread.wait(1000)   # stop the thread cleanly
+        return Polished_text_worker(text, self.text_box.toPlainText(), model_name)
 
-        self.worker.text_ready.connect(on_done)
-
-        # Cleanup safely
-        self.worker_thread.finished.connect(self.worker.deleteLater)
-        self.worker_thread.finished.connect(self.worker_thread.deleteLater)
-
-        self.worker_thread.start()
+    def polish_key(self, text: str):
+        selected_front_name = self.engine_dropdown.currentText()
+        model_name = GPT_Models.get(selected_front_name, selected_front_name)
+        return polish_cache_key(text, self.text_box.toPlainText(), model_name)
 
     # 🔹 Update output + emit polished text
+    def update_polish_partial(self, partial_text: str):
+        """Show a batch's polished text while it streams in."""
+        self.polish_tail.set_partial(partial_text)
+        scrollbar = self.translation_area.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+
     def update_translation_area(self, polished_text: str):
         if polished_text == self.last_polished_text:
+            self.polish_tail.discard()
             return
 
-        # Update text
-        self.accumulated_text+=" "+polished_text
-        self.translation_area.setPlainText(self.accumulated_text)
+        # Update text (replaces the streamed partial)
+        self.transcript.append(polished_text, "polished")
+        self.polish_tail.commit(polished_text)
         self.last_polished_text = polished_text
 
         # Always scroll to bottom after repaint
         scrollbar = self.translation_area.verticalScrollBar()
         QTimer.singleShot(0, lambda: scrollbar.setValue(scrollbar.maximum()))
         print(f"[Window5] final polished_text = '{polished_text}'")
-        requests.post("http://127.0.0.1:8000/update_transcription", json={"new_text": polished_text})
+        transcript_sync.notify("window5")  # posts only the new segment, off the GUI thread
         self.polished_text_ready.emit(polished_text)
 
     # === Window state persistence ===
@@ -1874,30 +1854,8 @@ class FeatureWindow5(QWidget):
     def closeEvent(self, event):
         """Ensure cleanup when the window is closed."""
         self.save_window_geometry()
-        try:
-            if getattr(self, "worker_thread", None):
-                if self.worker_thread.isRunning():
-                    if self.worker and hasattr(self.worker, "stop"):
-                        self.worker.stop()
-
-                    try:
-                        self.worker.text_ready.disconnect()
-                    except Exception:
-                        pass
-
-                    self.worker_thread.quit()
-                    if not self.worker_thread.wait(3000):  # wait max 3s
-                        print("[Window2] Forcing thread termination")
-                        self.worker_thread.terminate()
-                        self.worker_thread.wait(1000)
-
-        except Exception as e:
-            print(f"[Window2] Error during closeEvent: {e}")
-
-        # reset references
-        self.worker_thread = None
-        self.worker = None
-        self.is_polishing = False
+        self.polisher.stop()
+        transcript_sync.set_active("window4")
 
         self.btn_onoff.setChecked(False)
         self.btn_onoff.setText("OFF")
@@ -1906,7 +1864,7 @@ class FeatureWindow5(QWidget):
 
         super().closeEvent(event)
     def save_polished(self):
-        if not self.accumulated_text.strip():
+        if not len(self.transcript):
             self.translation_area.append("⚠️ No polishing to save.")
             return
 
@@ -1914,7 +1872,7 @@ class FeatureWindow5(QWidget):
         if file_path:
             try:
                 with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(self.translation_area.toPlainText())
+                    f.write(self.transcript.text())
                 self.translation_area.append(f"✅ Polished Text saved to {file_path}")
             except Exception as e:
                 self.translation_area.append(f"❌ Error saving Polished Text: {e}")
@@ -1936,7 +1894,7 @@ class FeatureWindow4(QWidget):
         self.speaker_worker = None
         
         # Add accumulated transcript variable
-        self.accumulated_transcript = ""
+        self.transcript = transcript_store.channel("window4")
 
         # Main vertical layout
         main_layout = QVBoxLayout()
@@ -1971,6 +1929,7 @@ class FeatureWindow4(QWidget):
         engine_layout.addWidget(self.engine_label)
         self.engine_dropdown = QComboBox()
         self.engine_dropdown.addItems(["Engine 1", "Engine 2", "Engine 3","Engine 4"])
+        self.engine_dropdown.addItems(HEDGED_ENGINES)  # two engines in parallel, earliest final wins
         engine_layout.addWidget(self.engine_dropdown)
         top_layout.addLayout(engine_layout)
 
@@ -1990,12 +1949,23 @@ class FeatureWindow4(QWidget):
         main_layout.addLayout(top_layout)
 
         # --- Transcript view ---
-        self.mic_box = QTextEdit()
-        self.mic_box.setReadOnly(True)
+        self.mic_box = TranscriptView(self.settings_manager.get("transcript_max_blocks", 0))
         self.mic_box.setPlaceholderText(f"Raw Transcript in {self.language_dropdown.currentText()}")
         main_layout.addWidget(self.mic_box)
         self.language_dropdown.currentTextChanged.connect(
             lambda lang: self.mic_box.setPlaceholderText(f"Raw Transcript ({lang})"))
+
+        # --- Audio pipeline health (ring, overruns, capture→send latency) ---
+        self.health_label = QLabel("")
+        main_layout.addWidget(self.health_label)
+        self.health_timer = QTimer()
+        self.health_timer.timeout.connect(self.update_health_label)
+        self.health_timer.start(1000)
+
+        # Interims are coalesced to a display rate; finals pass straight through
+        self.interim_coalescer = InterimCoalescer(rate_hz=20, parent=self)
+        self.interim_coalescer.transcription_ready.connect(self.update_speaker_text)
+
         self.download_transcript_btn = QPushButton("Download Transcript")
         self.download_transcript_btn.clicked.connect(self.save_transcript)
         main_layout.addWidget(self.download_transcript_btn)
@@ -2033,6 +2003,7 @@ class FeatureWindow4(QWidget):
 
         # Apply font to transcript and labels
         self.mic_box.setFont(font)
+        self.mic_box.setMaximumBlockCount(config.get("transcript_max_blocks", 0))
         self.onoff_label.setFont(font)
         self.lang_label.setFont(font)
         self.engine_label.setFont(font)
@@ -2044,6 +2015,15 @@ class FeatureWindow4(QWidget):
         self.engine_dropdown.setFont(font)
         self.dialect_dropdown.setFont(font)
         self.download_transcript_btn.setFont(font)
+        self.health_label.setFont(font)
+
+    def update_health_label(self):
+        metrics = getattr(self.speaker_worker, "metrics", None)
+        if metrics:
+            self.health_label.setText(f"{metrics.summary()} | {self.interim_coalescer.summary()}")
+        else:
+            self.health_label.setText("")
+
     def update_dialect_dropdown(self, lang):
         if lang in DIALECT_OPTIONS:
             self.dialect_dropdown.clear()
@@ -2125,7 +2105,7 @@ class FeatureWindow4(QWidget):
 
             # Reset transcript when starting
             if not getattr(self, "first_start", True):
-                self.accumulated_transcript += "--- ⚠️Switched Engine/Language ---\n"
+                self.transcript.append("--- ⚠️Switched Engine/Language ---\n", "marker")
                 self.mic_box.append("---⚠️ Switched Engine/Language ---\n")
             else:
                 # mark first start
@@ -2165,13 +2145,29 @@ class FeatureWindow4(QWidget):
                     channels=device_channel
                 )
             elif selected_engine == "Engine 4":
-                # 👇 Placeholder only, does nothing
-                print("Engine 4 selected (not implemented yet).")
-                return
+                # offline: local Whisper on CPU, keeps working without network/quota
+                self.speaker_worker = WhisperTranscriptionWorker(
+                    device_index=device_index,
+                    rate=48000,
+                    lang=transcription_language,
+                    role="Client",
+                    channels=device_channel
+                )
+            else:
+                # hedged: both engines share the captured audio, earliest final wins
+                self.speaker_worker = create_transcription_worker(
+                    selected_engine,
+                    device_index=device_index,
+                    rate=48000,
+                    lang=transcription_language,
+                    role="Client",
+                    channels=device_channel
+                )
 
             self.speaker_worker.moveToThread(self.speaker_thread)
             self.speaker_thread.started.connect(self.speaker_worker.run)
-            self.speaker_worker.transcription_ready.connect(self.update_speaker_text)
+            self.interim_coalescer.reset()
+            self.speaker_worker.transcription_ready.connect(self.interim_coalescer.push)
             self.speaker_worker.finished.connect(self.speaker_thread.quit)
             self.speaker_worker.finished.connect(self.speaker_worker.deleteLater)
 
@@ -2212,38 +2208,28 @@ class FeatureWindow4(QWidget):
         if not text.strip():
             return
 
-        if source in ("gcp_interim", "azure_interim", "xfyun_interim"):
+        if source in ("gcp_interim", "azure_interim", "xfyun_interim", "whisper_interim"):
             # Overwrite interim text
             self.interim_text = text.strip()
-            display_text = (self.accumulated_transcript + " " + self.interim_text).strip()
-            self.mic_box.setPlainText(display_text)
+            self.mic_box.set_interim(self.interim_text)  # replaces only the trailing interim block
 
-        elif source in ("gcp_final", "azure_final", "xfyun_final"):
+        elif source in ("gcp_final", "azure_final", "xfyun_final", "whisper_final"):
             # Lock in final text
             
-            if self.accumulated_transcript:
-                self.accumulated_transcript += " " + text.strip()
-            else:
-                self.accumulated_transcript = text.strip()
+            self.transcript.append(text.strip(), source)
 
             self.interim_text = ""  # clear interim on final
-            self.mic_box.setPlainText(self.accumulated_transcript)
-            print(self.accumulated_transcript)
+            self.mic_box.add_final(text.strip())
 
             # Emit signals for downstream
             self.polished_text_signal.emit(text.strip())
             self.raw_text_ready.emit(text.strip())
             #print(f"[Window4] update_speaker_text called with source={source}, text='{text}'")
-            #print(f"[Window4] accumulated_transcript = '{self.accumulated_transcript}'")
-            requests.post("http://127.0.0.1:8000/update_transcription", json={"new_text": self.accumulated_transcript}) 
+            transcript_sync.notify("window4")  # posts only the new segment, off the GUI thread
             log_transcript("Window 4", text.strip())
 
-        # Auto-scroll
-        cursor = self.mic_box.textCursor()
-        cursor.movePosition(cursor.End)
-        self.mic_box.setTextCursor(cursor)
     def save_transcript(self):
-        if not self.accumulated_transcript.strip():
+        if not len(self.transcript):
             self.mic_box.append("⚠️ No transcript to save.")
             return
 
@@ -2251,7 +2237,7 @@ class FeatureWindow4(QWidget):
         if file_path:
             try:
                 with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(self.mic_box.toPlainText())
+                    f.write(self.transcript.text())  # the view may be trimmed
                 self.mic_box.append(f"✅ Transcript saved to {file_path}")
             except Exception as e:
                 self.mic_box.append(f"❌ Error saving transcript: {e}")
@@ -2262,7 +2248,7 @@ class FeatureWindow3(QWidget):
         self.setWindowTitle("Window 3 for Translation")
         self.setGeometry(200, 200, 600, 500)
         self.settings_manager = settings_manager
-        self.accumulated_text=" "
+        self.transcript = transcript_store.channel("window3")
 
         # Main vertical layout
         main_layout = QVBoxLayout()
@@ -2308,6 +2294,9 @@ class FeatureWindow3(QWidget):
         self.mic_box = QTextEdit()
         self.mic_box.setReadOnly(True)
         self.mic_box.setPlaceholderText(f"Translated Text in {self.language_dropdown.currentText()}")
+        self.translation_tail = InlineTail(self.mic_box)
+        self.batcher = TranslationBatcher(parent=self)
+        self.batcher.translation_ready.connect(self.update_translation_area)
         main_layout.addWidget(self.mic_box)
         self.language_dropdown.currentTextChanged.connect(
             lambda lang: self.mic_box.setPlaceholderText(f"Translated Text in ({lang})"))
@@ -2320,7 +2309,6 @@ class FeatureWindow3(QWidget):
         self.apply_settings(self.settings_manager.config)
 
         self.setLayout(main_layout)
-        self.worker_thread = None
         self.worker = None
     @pyqtSlot(str)
     def handle_new_text(self, text: str):
@@ -2430,93 +2418,63 @@ class FeatureWindow3(QWidget):
         if not text or not text.strip():
             print("[W3] start_translation: empty text -> skipping")
             return
-        if getattr(self, "busy", False):
-            print("[W6] Translation already running, skipping new request.")
-            return
-        self.busy = True
-
         target_language = self.language_dropdown.currentData() or self.language_dropdown.currentText()
         selected_engine = self.engine_dropdown.currentText()
 
-        # Safely stop previous worker/thread if running
-        if getattr(self, "worker_thread", None) is not None:
-            try:
-                # ask thread to quit and wait shortly
-                self.worker_thread.quit()
-                self.worker_thread.wait(1000)
-            except Exception:
-                pass
-            finally:
-                self.worker_thread = None
-                self.worker = None
-
-        # Create new worker + thread
-        self.worker_thread = QThread()
-        if selected_engine == "Engine 1":
-
-            self.worker = Google_translation_worker(text, target_language)
-            self.worker.translation_ready.connect(self.update_translation_area)
-
-        elif selected_engine == "Engine 2":
-            self.worker = Azure_translation_worker(text, target_language)
-            self.worker.translation_ready.connect(self.update_translation_area)
+        if selected_engine in TRANSLATION_PROVIDERS:
+            # Google/Azure: queued and sent as multi-text requests, nothing is skipped
+            self.batcher.submit(text, selected_engine, target_language)
+            return
 
-        elif selected_engine == "Engine 3":
-            #prompt = self.text_box.toPlainText()
-            prompt=self.text_box.toPlainText().strip()
-            self.worker=Translation_worker(text,target_language,prompt)
-            self.worker.translation_ready.connect(self.update_translation_area)
+        if getattr(self, "busy", False):
+            print("[W6] Translation already running, skipping new request.")
+            return
+        self.busy = True
 
-        self.worker.moveToThread(self.worker_thread)
+        prompt=self.text_box.toPlainText().strip()
+        self.worker=Translation_worker(text,target_language,prompt)
+        self.worker.partial_ready.connect(self.update_translation_partial)
 
-        # Normal flow: when thread starts, call run()
-        self.worker_thread.started.connect(self.worker.run)
+        self.worker.translation_ready.connect(self.update_translation_area)
         self.worker.translation_ready.connect(lambda _: setattr(self, "busy", False))
 
-        # Always ensure thread quits and worker gets deleted when worker signals finished
-        if hasattr(self.worker, "finished"):
-            self.worker.finished.connect(self.worker_thread.quit)
-            self.worker.finished.connect(self.worker.deleteLater)
-            self.worker_thread.finished.connect(self.worker_thread.deleteLater)
+        # runs on the shared job pool; results arrive through the signals above
+        job_executor.submit(self.worker)
 
-        # Start thread
-        self.worker_thread.start()
 
+    def update_translation_partial(self, partial_text: str):
+        """Show a GPT translation while it streams in."""
+        scrollbar = self.mic_box.verticalScrollBar()
+        distance_from_bottom = scrollbar.maximum() - scrollbar.value()
+        self.translation_tail.set_partial(partial_text)
+        scrollbar.setValue(scrollbar.maximum() - distance_from_bottom)
 
     def update_translation_area(self, translated_text: str):
         scrollbar = self.mic_box.verticalScrollBar()
     # Save distance from bottom
         distance_from_bottom = scrollbar.maximum() - scrollbar.value()
-        self.accumulated_text+=" "+translated_text
-        self.mic_box.setPlainText(self.accumulated_text)
+        self.transcript.append(translated_text, "translation")
+        self.translation_tail.commit(translated_text)  # replaces the streamed partial, if any
 
         # Restore scroll relative to bottom
         scrollbar.setValue(scrollbar.maximum() - distance_from_bottom)
         
 
     def closeEvent(self, event):
-        try:
-            if getattr(self, "worker_thread", None) and self.worker_thread.isRunning():
-                # tell worker to stop if it has a stop() method
-                if self.worker and hasattr(self.worker, "stop"):
-                    self.worker.stop()
-
-                # disconnect signals so no callbacks after window closes
-                try:
-                    self.worker.translation_ready.disconnect()
-                except Exception:
-                    pass
-
-                # quit and wait for thread
-                self.worker_thread.quit()
-                self.worker_thread.wait(2000) 
-        except Exception as e:
-                print(f"[Window2] Error during closeEvent: {e}")
+        if getattr(self, "worker", None) is not None:
+            # disconnect signals so no callbacks after window closes
+            try:
+                self.worker.translation_ready.disconnect()
+            except Exception:
+                pass
+            self.worker = None
+        self.batcher.clear()
         self.mic_box.setPlainText("")
+        self.transcript = transcript_store.reset("window3")  # save writes what the view shows
         self.save_window_geometry()
         super().closeEvent(event)
     def save_polished(self):
-        if not self.accumulated_text.strip():
+        if not len(self.transcript):
             self.mic_box.append("⚠️ No Transaltion to save.")
             return
 
@@ -2524,7 +2482,7 @@ class FeatureWindow3(QWidget):
         if file_path:
             try:
                 with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(self.mic_box.toPlainText())
+                    f.write(self.transcript.text())
                 self.mic_box.append(f"✅ Translated Text saved to {file_path}")
             except Exception as e:
                 self.mic_box.append(f"❌ Error saving Translated Text: {e}")
@@ -2538,7 +2496,10 @@ class FeatureWindow2(QWidget):
         self.latest_text = ""
         self.last_sent_text = ""
         self.last_polished_text = ""
-        self.accumulated_text=" "
+        self.transcript = transcript_store.channel("window2")
+        self.polisher = PolishScheduler(self.make_polish_worker, self.polish_key, parent=self)
+        self.polisher.polished_ready.connect(self.update_translation_area)
+        self.polisher.partial_ready.connect(self.update_polish_partial)
         # Main vertical layout (everything stacks vertically)
         main_layout = QVBoxLayout()
 
@@ -2576,6 +2537,7 @@ class FeatureWindow2(QWidget):
         self.translation_area = QTextEdit()
         self.translation_area.setReadOnly(True)
         self.translation_area.setPlaceholderText("Polished text will appear here...")
+        self.polish_tail = InlineTail(self.translation_area)
         main_layout.addWidget(self.translation_area, stretch=1) 
 
         self.download_transcript_btn = QPushButton("Download Polished Text")
@@ -2617,45 +2579,33 @@ class FeatureWindow2(QWidget):
             self.start_polish(self.latest_text)
 
     def start_polish(self, text: str):
-    # avoid overlapping polish requests
-        if getattr(self, "is_polishing", False):
-            return
-        self.is_polishing = True
-
-        prompt = self.text_box.toPlainText()
+        # queued and batched; segments arriving while a request runs are not dropped
+        self.polisher.submit(text)
 
-        # Create worker + thread
-        self.worker_thread = QThread()
+    def make_polish_worker(self, text: str):
         selected_front_name = self.engine_dropdown.currentText()
         model_name = GPT_Models.get(selected_front_name, selected_front_name)
-        self.worker = Polished_text_worker(text, prompt, model_name)
-        self.worker.moveToThread(self.worker_thread)
+        return Polished_text_worker(text, self.text_box.toPlainText(), model_name)
 
-        # Run when thread starts
-        self.worker_thread.started.connect(self.worker.run)
-
-        # On result
-        def on_done(result_text: str):
-            self.is_polishing = False
-            self.update_translation_area(result_text)
-            self.worker_thread.quit()
-            self.worker_thread.wait(1000)   # stop the thread cleanly
-
-        self.worker.text_ready.connect(on_done)
-
-        # Cleanup safely
-        self.worker_thread.finished.connect(self.worker.deleteLater)
-        self.worker_thread.finished.connect(self.worker_thread.deleteLater)
+    def polish_key(self, text: str):
+        selected_front_name = self.engine_dropdown.currentText()
+        model_name = GPT_Models.get(selected_front_name, selected_front_name)
+        return polish_cache_key(text, self.text_box.toPlainText(), model_name)
 
-        self.worker_thread.start()
+    def update_polish_partial(self, partial_text: str):
+        """Show a batch's polished text while it streams in."""
+        self.polish_tail.set_partial(partial_text)
+        scrollbar = self.translation_area.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
 
     def update_translation_area(self, polished_text: str):
         if polished_text == self.last_polished_text:
+            self.polish_tail.discard()
             return
 
-        # Update text
-        self.accumulated_text+=" "+polished_text
-        self.translation_area.setPlainText(self.accumulated_text)
+        # Update text (replaces the streamed partial)
+        self.transcript.append(polished_text, "polished")
+        self.polish_tail.commit(polished_text)
         self.last_polished_text = polished_text
 
         # Always scroll to bottom after repaint
@@ -2736,30 +2686,7 @@ class FeatureWindow2(QWidget):
     def closeEvent(self, event):
         """Ensure cleanup when the window is closed."""
         self.save_window_geometry()
-        try:
-            if getattr(self, "worker_thread", None):
-                if self.worker_thread.isRunning():
-                    if self.worker and hasattr(self.worker, "stop"):
-                        self.worker.stop()
-
-                    try:
-                        self.worker.text_ready.disconnect()
-                    except Exception:
-                        pass
-
-                    self.worker_thread.quit()
-                    if not self.worker_thread.wait(3000):  # wait max 3s
-                        print("[Window2] Forcing thread termination")
-                        self.worker_thread.terminate()
-                        self.worker_thread.wait(1000)
-
-        except Exception as e:
-            print(f"[Window2] Error during closeEvent: {e}")
-
-        # reset references
-        self.worker_thread = None
-        self.worker = None
-        self.is_polishing = False
+        self.polisher.stop()
 
         self.btn_onoff.setChecked(False)
         self.btn_onoff.setText("OFF")
@@ -2768,7 +2695,7 @@ class FeatureWindow2(QWidget):
 
         super().closeEvent(event)
     def save_polished(self):
-        if not self.accumulated_text.strip():
+        if not len(self.transcript):
             self.translation_area.append("⚠️ No polishing to save.")
             return
 
@@ -2776,7 +2703,7 @@ class FeatureWindow2(QWidget):
         if file_path:
             try:
                 with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(self.translation_area.toPlainText())
+                    f.write(self.transcript.text())
                 self.translation_area.append(f"✅ Polished Text saved to {file_path}")
             except Exception as e:
                 self.translation_area.append(f"❌ Error saving Polished Text: {e}")
@@ -2799,7 +2726,7 @@ class FeatureWindow1(QWidget):
         self.speaker_worker = None
         
         # Add accumulated transcript variable
-        self.accumulated_transcript = ""
+        self.transcript = transcript_store.channel("window1")
 
         # Main vertical layout
         main_layout = QVBoxLayout()
@@ -2834,6 +2761,7 @@ class FeatureWindow1(QWidget):
         engine_layout.addWidget(self.engine_label)
         self.engine_dropdown = QComboBox()
         self.engine_dropdown.addItems(["Engine 1", "Engine 2", "Engine 3","Engine 4"])
+        self.engine_dropdown.addItems(HEDGED_ENGINES)  # two engines in parallel, earliest final wins
         engine_layout.addWidget(self.engine_dropdown)
         top_layout.addLayout(engine_layout)
 
@@ -2853,12 +2781,23 @@ class FeatureWindow1(QWidget):
         main_layout.addLayout(top_layout)
 
         # --- Transcript view ---
-        self.mic_box = QTextEdit()
-        self.mic_box.setReadOnly(True)
+        self.mic_box = TranscriptView(self.settings_manager.get("transcript_max_blocks", 0))
         self.mic_box.setPlaceholderText(f"Raw Transcript in {self.language_dropdown.currentText()}")
         main_layout.addWidget(self.mic_box)
         self.language_dropdown.currentTextChanged.connect(
             lambda lang: self.mic_box.setPlaceholderText(f"Raw Transcript ({lang})"))
+
+        # --- Audio pipeline health (ring, overruns, capture→send latency) ---
+        self.health_label = QLabel("")
+        main_layout.addWidget(self.health_label)
+        self.health_timer = QTimer()
+        self.health_timer.timeout.connect(self.update_health_label)
+        self.health_timer.start(1000)
+
+        # Interims are coalesced to a display rate; finals pass straight through
+        self.interim_coalescer = InterimCoalescer(rate_hz=20, parent=self)
+        self.interim_coalescer.transcription_ready.connect(self.update_speaker_text)
+
         self.download_transcript_btn = QPushButton("Download Transcript")
         self.download_transcript_btn.clicked.connect(self.save_transcript)
         main_layout.addWidget(self.download_transcript_btn)
@@ -2870,6 +2809,14 @@ class FeatureWindow1(QWidget):
         # Connect settings updates
         self.settings_manager.setting_changed.connect(self.apply_settings)
         self.apply_settings(self.settings_manager.config)
+
+    def update_health_label(self):
+        metrics = getattr(self.speaker_worker, "metrics", None)
+        if metrics:
+            self.health_label.setText(f"{metrics.summary()} | {self.interim_coalescer.summary()}")
+        else:
+            self.health_label.setText("")
+
     def update_dialect_dropdown(self, lang):
         if lang in DIALECT_OPTIONS:
             self.dialect_dropdown.clear()
@@ -2906,6 +2853,7 @@ class FeatureWindow1(QWidget):
 
         # Apply font to transcript and labels
         self.mic_box.setFont(font)
+        self.mic_box.setMaximumBlockCount(config.get("transcript_max_blocks", 0))
         self.onoff_label.setFont(font)
         self.lang_label.setFont(font)
         self.engine_label.setFont(font)
@@ -2917,6 +2865,7 @@ class FeatureWindow1(QWidget):
         self.engine_dropdown.setFont(font)
         self.dialect_dropdown.setFont(font)
         self.download_transcript_btn.setFont(font)
+        self.health_label.setFont(font)
 
     def load_window_geometry(self):
         if os.path.exists(CONFIG_FILE):
@@ -2986,7 +2935,7 @@ class FeatureWindow1(QWidget):
 
             # Reset transcript when starting
             if not getattr(self, "first_start", True):
-                self.accumulated_transcript += "--- ⚠️Switched Engine/Language ---\n"
+                self.transcript.append("--- ⚠️Switched Engine/Language ---\n", "marker")
                 self.mic_box.append("---⚠️ Switched Engine/Language ---\n")
             else:
                 # mark first start
@@ -3031,15 +2980,31 @@ class FeatureWindow1(QWidget):
                     channels=device_channel
                 )
             elif selected_engine == "Engine 4":
-                # 👇 Placeholder only, does nothing
-                print(" ")
-                return
+                # offline: local Whisper on CPU, keeps working without network/quota
+                self.speaker_worker = WhisperTranscriptionWorker(
+                    device_index=device_index,
+                    rate=48000,
+                    lang=transcription_language,
+                    role="Developer",
+                    channels=device_channel
+                )
+            else:
+                # hedged: both engines share the captured audio, earliest final wins
+                self.speaker_worker = create_transcription_worker(
+                    selected_engine,
+                    device_index=device_index,
+                    rate=48000,
+                    lang=transcription_language,
+                    role="Developer",
+                    channels=device_channel
+                )
             
 
                         # AFTER creating self.speaker_thread and moving worker...
             self.speaker_worker.moveToThread(self.speaker_thread)
             self.speaker_thread.started.connect(self.speaker_worker.run)
-            self.speaker_worker.transcription_ready.connect(self.update_speaker_text)
+            self.interim_coalescer.reset()
+            self.speaker_worker.transcription_ready.connect(self.interim_coalescer.push)
             self.speaker_worker.finished.connect(self.speaker_thread.quit)
             self.speaker_worker.finished.connect(self.speaker_worker.deleteLater)
 
@@ -3082,34 +3047,26 @@ class FeatureWindow1(QWidget):
         if not text.strip():
             return
 
-        if source in ("gcp_interim", "azure_interim", "xfyun_interim"):
+        if source in ("gcp_interim", "azure_interim", "xfyun_interim", "whisper_interim"):
             # Overwrite interim text
             self.interim_text = text.strip()
-            display_text = (self.accumulated_transcript + " " + self.interim_text).strip()
-            self.mic_box.setPlainText(display_text)
+            self.mic_box.set_interim(self.interim_text)  # replaces only the trailing interim block
 
-        elif source in ("gcp_final", "azure_final", "xfyun_final"):
+        elif source in ("gcp_final", "azure_final", "xfyun_final", "whisper_final"):
             # Lock in final text
             
-            if self.accumulated_transcript:
-                self.accumulated_transcript += " " + text.strip()
-            else:
-                self.accumulated_transcript = text.strip()
+            self.transcript.append(text.strip(), source)
 
             self.interim_text = ""  # clear interim on final
-            self.mic_box.setPlainText(self.accumulated_transcript)
+            self.mic_box.add_final(text.strip())
 
             # Emit signals for downstream
             log_transcript("Window 1", text.strip())
             self.polished_text_signal.emit(text.strip())
             self.raw_text_ready.emit(text.strip())
 
-        # Auto-scroll
-        cursor = self.mic_box.textCursor()
-        cursor.movePosition(cursor.End)
-        self.mic_box.setTextCursor(cursor)
     def save_transcript(self):
-        if not self.accumulated_transcript.strip():
+        if not len(self.transcript):
             self.mic_box.append("⚠️ No transcript to save.")
             return
 
@@ -3117,7 +3074,7 @@ class FeatureWindow1(QWidget):
         if file_path:
             try:
                 with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(self.mic_box.toPlainText())
+                    f.write(self.transcript.text())  # the view may be trimmed
                 self.mic_box.append(f"✅ Transcript saved to {file_path}")
             except Exception as e:
                 self.mic_box.append(f"❌ Error saving transcript: {e}")
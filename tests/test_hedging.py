@@ -0,0 +1,67 @@
+import time
+import unittest
+
+try:
+    from PyQt5.QtCore import QCoreApplication, QObject, QThread, Qt, pyqtSignal
+    from cloud_transcription.hedging import HedgedTranscriptionWorker
+except (ImportError, OSError) as e:  # Qt, the engine SDKs or PortAudio missing
+    HedgedTranscriptionWorker = None
+    SKIP_REASON = f"hedging not importable: {e}"
+else:
+    SKIP_REASON = ""
+
+    class FakeEngine(QObject):
+        """Streams until stopped, then sends one trailing final, like the engines do."""
+        transcription_ready = pyqtSignal(str, str)
+        segment_ready = pyqtSignal(str, float, float, object)
+        finished = pyqtSignal()
+
+        def __init__(self, name, start, end, drain_s=0.2):
+            super().__init__()
+            self.name = name
+            self.start = start
+            self.end = end
+            self.drain_s = drain_s
+            self._running = True
+
+        def run(self):
+            while self._running:
+                time.sleep(0.01)
+            time.sleep(self.drain_s)  # e.g. waiting for the server's last result
+            self.segment_ready.emit(f"{self.name} tail", self.start, self.end, [])
+            self.finished.emit()
+
+        def stop(self):
+            self._running = False
+
+
+@unittest.skipIf(HedgedTranscriptionWorker is None, SKIP_REASON)
+class HedgedStopTest(unittest.TestCase):
+    def test_stop_quit_wait_delivers_both_trailing_finals(self):
+        app = QCoreApplication.instance() or QCoreApplication([])
+        hedged = HedgedTranscriptionWorker({
+            "gcp": FakeEngine("gcp", 0.0, 2.0),
+            "xfyun": FakeEngine("xfyun", 2.0, 4.0, drain_s=0.5),
+        })
+        received = []
+        hedged.transcription_ready.connect(lambda text, source: received.append((text, source)),
+                                           Qt.DirectConnection)
+
+        # the windows' sequence: run on a QThread, then stop(), quit(), wait()
+        thread = QThread()
+        hedged.moveToThread(thread)
+        thread.started.connect(hedged.run)
+        thread.start()
+        time.sleep(0.2)
+        hedged.stop()
+        thread.quit()
+        self.assertTrue(thread.wait(2000))
+        app.processEvents()
+
+        self.assertIn(("gcp tail", "gcp_final"), received)
+        self.assertIn(("xfyun tail", "xfyun_final"), received)
+        self.assertTrue(any(source == "hedge_status" for _, source in received))
+
+
+if __name__ == "__main__":
+    unittest.main()
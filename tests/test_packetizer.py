@@ -0,0 +1,62 @@
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from cloud_transcription.packetizer import Packetizer, SendTimeline
+from cloud_transcription.ring_buffer import AudioRingBuffer
+
+
+class PacketizerTest(unittest.TestCase):
+    def test_256_frame_blocks_become_whole_packets(self):
+        ring = AudioRingBuffer(48000, samplerate=48000)
+        packetizer = Packetizer(ring, packet_ms=50)  # 2400 frames
+        for _ in range(20):
+            ring.write(np.ones(256, dtype=np.float32))  # 5120 frames
+        self.assertEqual(len(packetizer.next_packet()), 2400)
+        self.assertEqual(len(packetizer.next_packet()), 2400)
+        ring.close()
+        self.assertEqual(len(packetizer.next_packet()), 320)  # remainder flushed on close
+        self.assertIsNone(packetizer.next_packet())
+        self.assertEqual(packetizer.packets, 3)
+
+    def test_stalled_capture_flushes_after_max_latency(self):
+        ring = AudioRingBuffer(16000, samplerate=16000)
+        packetizer = Packetizer(ring, packet_ms=100, max_latency_ms=30)
+        ring.write(np.ones(256, dtype=np.float32))
+        t0 = time.monotonic()
+        self.assertEqual(len(packetizer.next_packet()), 256)
+        self.assertLess(time.monotonic() - t0, 0.5)
+        self.assertEqual(packetizer.latency_flushes, 1)
+
+    def test_iteration_ends_when_the_ring_is_closed(self):
+        ring = AudioRingBuffer(4800, samplerate=48000)
+        packetizer = Packetizer(ring, packet_ms=20)  # 960 frames
+
+        def produce():
+            for _ in range(15):
+                while ring.write(np.ones(256, dtype=np.float32)) == 0:
+                    time.sleep(0.001)
+                time.sleep(0.001)
+            ring.close()
+
+        threading.Thread(target=produce).start()
+        sizes = [len(p) for p in packetizer]
+        self.assertEqual(sum(sizes), 15 * 256)
+        self.assertTrue(all(0 < size <= 960 for size in sizes))  # short only on a latency flush
+
+
+class SendTimelineTest(unittest.TestCase):
+    def test_positions_map_back_to_capture_time(self):
+        timeline = SendTimeline(16000)
+        self.assertIsNone(timeline.capture_time(0))
+        timeline.mark(1600, 10.1)   # first 100 ms packet
+        timeline.mark(3200, 25.2)   # silence suppressed in between
+        self.assertAlmostEqual(timeline.capture_time(800), 10.05)
+        self.assertAlmostEqual(timeline.capture_time(2400), 25.15)
+        self.assertAlmostEqual(timeline.capture_time(4800), 25.3)  # past the last mark
+
+
+if __name__ == "__main__":
+    unittest.main()
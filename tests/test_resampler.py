@@ -0,0 +1,45 @@
+import unittest
+
+import numpy as np
+
+from cloud_transcription.resampler import StreamingResampler
+
+
+def tone(freq, rate, seconds=1.0):
+    t = np.arange(int(rate * seconds)) / rate
+    return (0.5 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def rms(x):
+    return float(np.sqrt(np.mean(x * x)))
+
+
+class StreamingResamplerTest(unittest.TestCase):
+    def test_chunked_equals_one_shot(self):
+        signal = np.random.default_rng(0).standard_normal(48000).astype(np.float32)
+        for in_rate in (48000, 44100):
+            with self.subTest(in_rate=in_rate):
+                whole = StreamingResampler(in_rate, 16000).process(signal)
+                chunked = StreamingResampler(in_rate, 16000)
+                sizes = np.random.default_rng(1).integers(1, 700, 400)
+                bounds = np.cumsum(np.concatenate([[0], sizes]))
+                parts = [chunked.process(signal[a:b]) for a, b in zip(bounds[:-1], bounds[1:]) if a < len(signal)]
+                np.testing.assert_allclose(np.concatenate(parts), whole, atol=1e-5)
+                self.assertEqual(len(whole), -(-len(signal) * 16000 // in_rate))
+
+    def test_passband_kept_and_alias_band_removed(self):
+        resampler = StreamingResampler(48000, 16000)
+        out = resampler.process(tone(1000, 48000))
+        self.assertAlmostEqual(rms(out[1000:]), rms(tone(1000, 16000)), delta=0.01)
+
+        resampler.reset()
+        aliased = resampler.process(tone(15000, 48000))  # would fold to 1 kHz
+        self.assertLess(rms(aliased[1000:]), 0.005)
+
+    def test_same_rate_is_a_pass_through(self):
+        signal = tone(440, 16000, 0.1)
+        self.assertIs(StreamingResampler(16000, 16000).process(signal), signal)
+
+
+if __name__ == "__main__":
+    unittest.main()
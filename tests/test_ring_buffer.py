@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+
+from cloud_transcription.ring_buffer import AudioRingBuffer, to_pcm16
+
+
+class AudioRingBufferTest(unittest.TestCase):
+    def test_read_across_the_wrap(self):
+        ring = AudioRingBuffer(8)
+        ring.write(np.arange(6, dtype=np.float32))
+        np.testing.assert_array_equal(ring.read(4), [0, 1, 2, 3])
+        ring.write(np.arange(6, 12, dtype=np.float32))  # wraps past the end
+        head, tail = ring.peek()
+        self.assertEqual((len(head), len(tail)), (4, 4))
+        np.testing.assert_array_equal(ring.read(), np.arange(4, 12))
+        self.assertEqual(ring.available(), 0)
+
+    def test_stereo_is_mixed_to_mono(self):
+        ring = AudioRingBuffer(8)
+        ring.write(np.array([[1.0, 0.0], [0.5, 0.5], [-1.0, 1.0]], dtype=np.float32))
+        ring.write(np.array([[0.25]], dtype=np.float32))
+        np.testing.assert_array_equal(ring.read(), [0.5, 0.5, 0.0, 0.25])
+
+    def test_overrun_drops_newest_frames_and_counts_them(self):
+        ring = AudioRingBuffer(4)
+        self.assertEqual(ring.write(np.arange(3, dtype=np.float32)), 3)
+        self.assertEqual(ring.write(np.arange(3, 6, dtype=np.float32)), 1)
+        self.assertEqual((ring.overruns, ring.dropped_frames), (1, 2))
+        np.testing.assert_array_equal(ring.read(), [0, 1, 2, 3])  # reader's data intact
+
+    def test_wait_returns_on_close(self):
+        ring = AudioRingBuffer(8)
+        self.assertFalse(ring.wait(4, timeout=0.01))
+        ring.write(np.ones(2, dtype=np.float32))
+        ring.close()
+        self.assertTrue(ring.wait(4))  # closed with frames left: drain them
+        ring.read()
+        self.assertFalse(ring.wait(4))
+
+    def test_capture_time_counts_back_from_the_last_write(self):
+        ring = AudioRingBuffer(48000, samplerate=48000)
+        ring.write(np.zeros(4800, dtype=np.float32))
+        self.assertAlmostEqual(ring.last_write_time - ring.capture_time(4799 - 480), 0.01)
+
+    def test_to_pcm16_clips(self):
+        pcm = np.frombuffer(to_pcm16(np.array([-2.0, 0.0, 1.0], dtype=np.float32)), dtype="<i2")
+        np.testing.assert_array_equal(pcm, [-32767, 0, 32767])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from cloud_transcription.segment_merge import SegmentMerger, estimate_words
+
+
+class SegmentMergerTest(unittest.TestCase):
+    def test_overlapping_final_is_trimmed_to_new_words(self):
+        merger = SegmentMerger(tolerance_s=0.3)
+        # GCP: "hello there" over 0-3 s; Azure then finalizes 0-5 s as one segment
+        self.assertEqual(merger.merge("hello there", 0.0, 3.0), "hello there")
+        azure = merger.merge("hello there how are you", 0.0, 5.0,
+                             [(0.0, "hello "), (0.8, "there "), (3.1, "how "), (3.6, "are "), (4.2, "you")])
+        self.assertEqual(azure, "how are you")
+        self.assertEqual(merger.covered_until, 5.0)
+
+    def test_covered_final_is_suppressed(self):
+        merger = SegmentMerger()
+        merger.merge("one two three four", 10.0, 20.0)
+        self.assertIsNone(merger.merge("two three", 13.0, 19.0))
+        self.assertIsNone(merger.merge("four", 18.0, 20.2))  # within tolerance of the covered end
+
+    def test_long_session_final_only_adds_its_tail(self):
+        # Engine 1 finals every few seconds, then XFYun's whole-session final
+        merger = SegmentMerger()
+        merger.merge("first part", 0.0, 4.0)
+        merger.merge("second part", 4.2, 9.0)
+        words = [(0.0, "first "), (2.0, "part "), (4.3, "second "), (6.0, "part "), (9.5, "third "), (11.0, "bit")]
+        self.assertEqual(merger.merge("first part second part third bit", 0.0, 12.0, words), "third bit")
+
+    def test_new_final_after_covered_audio_passes_whole(self):
+        merger = SegmentMerger()
+        merger.merge("a b", 0.0, 2.0)
+        self.assertEqual(merger.merge("c d", 2.1, 4.0), "c d")
+
+    def test_estimated_words_without_spaces_split_per_character(self):
+        words = estimate_words("你好世界", 0.0, 4.0)
+        self.assertEqual([piece for _, piece in words], ["你", "好", "世", "界"])
+        merger = SegmentMerger()
+        merger.merge("你好", 0.0, 2.0)
+        self.assertEqual(merger.merge("你好世界", 0.0, 4.0), "世界")
+
+
+if __name__ == "__main__":
+    unittest.main()
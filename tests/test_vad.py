@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+
+from cloud_transcription.vad import EnergyZcrDetector, VoiceActivityGate
+
+RATE = 16000
+PACKET = RATE // 20  # 50 ms
+
+
+def packets(signal):
+    return [signal[i:i + PACKET] for i in range(0, len(signal) - PACKET + 1, PACKET)]
+
+
+def white_noise(seconds, rms, seed=0):
+    return (np.random.default_rng(seed).standard_normal(int(RATE * seconds)) * rms).astype(np.float32)
+
+
+def rumble(seconds, rms, seed=0):
+    """Low-frequency noise (traffic, HVAC): integrated white noise, normalized."""
+    x = np.cumsum(np.random.default_rng(seed).standard_normal(int(RATE * seconds)))
+    x -= np.convolve(x, np.ones(801) / 801, mode="same")  # drop the drift
+    return (x / np.sqrt(np.mean(x * x)) * rms).astype(np.float32)
+
+
+def voiced(seconds, rms, f0=140.0):
+    """Speech-like: harmonics of f0 with a 4 Hz syllable envelope."""
+    t = np.arange(int(RATE * seconds)) / RATE
+    x = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6))
+    x *= 0.3 + 0.7 * np.abs(np.sin(2 * np.pi * 2.0 * t))
+    return (x / np.sqrt(np.mean(x * x)) * rms).astype(np.float32)
+
+
+class VoiceActivityGateTest(unittest.TestCase):
+    def run_gate(self, signal):
+        gate = VoiceActivityGate(RATE)
+        sent = [gate.process(p) for p in packets(signal)]
+        return gate, sent
+
+    def test_quiet_room_is_suppressed(self):
+        gate, _ = self.run_gate(white_noise(10, 0.001))
+        self.assertGreater(gate.suppressed_fraction, 0.9)
+
+    def test_loud_stationary_noise_is_learned(self):
+        for name, noise in (("white", white_noise(20, 0.05)), ("rumble", rumble(20, 10 ** (-34 / 20)))):
+            with self.subTest(name):
+                gate, sent = self.run_gate(noise)
+                self.assertGreater(gate.suppressed_fraction, 0.6)
+                tail = sent[-len(sent) // 4:]  # after the floor has settled
+                passed = sum(any(p is not gate._keepalive for p in out) for out in tail)
+                self.assertLess(passed / len(tail), 0.2)
+
+    def test_speech_over_noise_passes(self):
+        noise = white_noise(16, 0.02, seed=1)
+        detector = EnergyZcrDetector(RATE)
+        for p in packets(noise[:RATE * 8]):
+            detector.detect(p)  # settle on the room first
+
+        speech = noise[RATE * 8:].copy()
+        for start in range(0, 8, 2):  # 1 s talk, 1 s pause
+            speech[RATE * start:RATE * (start + 1)] += voiced(1, 0.1)
+        decisions = [detector.detect(p) for p in packets(speech)]
+        per_second = len(decisions) // 8
+        talk = [d for i, d in enumerate(decisions) if (i // per_second) % 2 == 0]
+        pause = [d for i, d in enumerate(decisions) if (i // per_second) % 2 == 1]
+        self.assertGreater(sum(talk) / len(talk), 0.9)
+        self.assertLess(sum(pause) / len(pause), 0.2)
+
+    def test_packet_shorter_than_a_frame(self):
+        detector = EnergyZcrDetector(RATE)
+        with np.errstate(all="raise"):
+            self.assertFalse(detector.detect(np.zeros(1, dtype=np.float32)))
+            self.assertFalse(detector.detect(np.zeros(0, dtype=np.float32)))
+            detector.detect(white_noise(0.01, 0.001))  # under one 20 ms frame
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+# transcript_store.py
+import threading
+import time
+from collections import namedtuple
+
+Segment = namedtuple("Segment", "seq time source text")
+
+
+class TranscriptChannel:
+    """Append-only list of timestamped segments for one text stream.
+
+    ``append`` is O(1); readers take the segments after a version they have
+    already seen (``since``) or the last few (``tail``) without copying the
+    rest. ``text()`` joins lazily and caches the result until the next
+    append, so saving or posting the whole transcript costs one join.
+    """
+
+    def __init__(self, name, sep=" "):
+        self.name = name
+        self.sep = sep
+        self._lock = threading.Lock()
+        self._segments = []
+        self._joined = None  # (version, text)
+
+    @property
+    def version(self):
+        """Number of segments appended so far; only ever grows."""
+        return len(self._segments)
+
+    def __len__(self):
+        return len(self._segments)
+
+    def append(self, text, source=""):
+        with self._lock:
+            segment = Segment(len(self._segments), time.time(), source, text)
+            self._segments.append(segment)
+        return segment
+
+    def since(self, version):
+        """Segments appended after ``version``."""
+        with self._lock:
+            return self._segments[version:]
+
+    def tail(self, n):
+        with self._lock:
+            return self._segments[-n:] if n > 0 else []
+
+    def text(self):
+        with self._lock:
+            version = len(self._segments)
+            if self._joined is None or self._joined[0] != version:
+                self._joined = (version, self.sep.join(s.text for s in self._segments))
+            return self._joined[1]
+
+
+class TranscriptStore:
+    """Named transcript channels shared by every window (``window4`` etc.)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels = {}
+
+    def channel(self, name):
+        with self._lock:
+            channel = self._channels.get(name)
+            if channel is None:
+                channel = self._channels[name] = TranscriptChannel(name)
+            return channel
+
+    def reset(self, name):
+        """Start ``name`` over with an empty channel (a window cleared its view).
+
+        Whoever holds the old channel keeps it. Not for streams mirrored by
+        ``transcript_sync``, whose seqs must only grow.
+        """
+        with self._lock:
+            channel = self._channels[name] = TranscriptChannel(name)
+            return channel
+
+    def channels(self):
+        with self._lock:
+            return dict(self._channels)
+
+
+# Global instance
+transcript_store = TranscriptStore()
@@ -0,0 +1,106 @@
+# transcript_sync.py
+import threading
+import time
+import uuid
+import requests
+from transcript_store import transcript_store
+
+BACKEND_URL = "http://127.0.0.1:8000"
+_ACTIVE = object()  # dirty marker: the active stream has to be posted
+
+
+class TranscriptSync:
+    """Mirrors transcript channels to the FastAPI backend as append-only deltas.
+
+    Windows call :meth:`notify` after appending to a channel; a background
+    thread posts the segments the backend has not acknowledged yet to
+    ``/append_transcription``. The reply's ``next_seq`` is where the next
+    post starts, so a lost reply is simply resent (the backend skips seqs it
+    has) and a gap or backend restart resends from what it actually holds.
+    :meth:`set_active` tells the backend which stream its readers get.
+    """
+
+    def __init__(self, url=BACKEND_URL, timeout=5.0, retry_s=2.0, max_segments=200):
+        self.url = url
+        self.timeout = timeout
+        self.retry_s = retry_s
+        self.max_segments = max_segments  # per post, so a resync goes out in chunks
+        self.session_id = uuid.uuid4().hex  # tells the backend this is a fresh run
+        self._session = requests.Session()
+        self._acked = {}  # stream -> next seq the backend expects
+        self.active = None
+        self._dirty = set()
+        self._cond = threading.Condition()
+        self._thread = None
+
+        # stats
+        self.posts = 0
+        self.segments_sent = 0
+        self.failures = 0
+
+    def notify(self, stream):
+        """Schedule a sync of ``stream``; never blocks the caller."""
+        with self._cond:
+            self._dirty.add(stream)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="transcript-sync", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def set_active(self, stream):
+        """Make ``stream`` the one backend readers (RAG, question extraction) see."""
+        self.active = stream
+        self.notify(_ACTIVE)
+
+    def _run(self):
+        try:
+            while True:
+                with self._cond:
+                    while not self._dirty:
+                        self._cond.wait()
+                    streams, self._dirty = self._dirty, set()
+                for stream in streams:
+                    try:
+                        if stream is _ACTIVE:
+                            self._push_active()
+                        elif self._push(stream):
+                            self.notify(stream)  # more to send
+                    except Exception as e:  # e.g. a malformed reply; the thread must survive it
+                        self.failures += 1
+                        print(f"[TranscriptSync] {stream}: {e}; retrying in {self.retry_s:.0f}s")
+                        time.sleep(self.retry_s)
+                        self.notify(stream)
+        finally:
+            with self._cond:
+                self._thread = None  # the next notify starts a fresh one
+
+    def _push_active(self):
+        resp = self._session.post(f"{self.url}/active_stream", json={"stream": self.active},
+                                  timeout=self.timeout)
+        resp.raise_for_status()
+
+    def _push(self, stream):
+        """Post one batch; returns True if the channel still has unsent segments."""
+        channel = transcript_store.channel(stream)
+        start = self._acked.get(stream, 0)
+        segments = channel.since(start)[:self.max_segments]
+        if not segments:
+            return False
+        resp = self._session.post(
+            f"{self.url}/append_transcription",
+            json={
+                "stream": stream,
+                "session": self.session_id,
+                "segments": [{"seq": s.seq, "text": s.text} for s in segments],
+            },
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        self._acked[stream] = resp.json()["next_seq"]
+        self.posts += 1
+        self.segments_sent += len(segments)
+        return self._acked[stream] < channel.version
+
+
+# Global instance
+transcript_sync = TranscriptSync()
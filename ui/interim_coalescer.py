@@ -0,0 +1,68 @@
+# interim_coalescer.py
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+
+
+class InterimCoalescer(QObject):
+    """Rate-limits interim hypotheses between a worker and a window.
+
+    Connect the worker's ``transcription_ready`` to :meth:`push` and the
+    window's slot to this object's ``transcription_ready``. Only the latest
+    interim per stream (``gcp``, ``azure``, ...) is kept and delivered at
+    most ``rate_hz`` times a second; finals and status messages go through
+    immediately and in order, and a final discards its stream's pending
+    interim since it supersedes it.
+    """
+    transcription_ready = pyqtSignal(str, str)  # text, source
+
+    def __init__(self, rate_hz=20, parent=None):
+        super().__init__(parent)
+        self._pending = {}  # stream -> (text, source), insertion ordered
+        self._timer = QTimer(self)
+        self._timer.setInterval(int(1000 / rate_hz))
+        self._timer.timeout.connect(self._flush)
+
+        # counters
+        self.interims_received = 0
+        self.interims_delivered = 0
+        self.interims_dropped = 0
+        self.finals = 0
+
+    @pyqtSlot(str, str)
+    def push(self, text, source):
+        stream, _, kind = source.rpartition("_")
+        if kind == "interim":
+            self.interims_received += 1
+            if not self._timer.isActive():
+                # idle: show it now and open a throttling interval
+                self._deliver(text, source)
+                self._timer.start()
+                return
+            if stream in self._pending:
+                self.interims_dropped += 1
+            self._pending[stream] = (text, source)
+            return
+
+        if kind == "final":
+            self.finals += 1
+            if self._pending.pop(stream, None):
+                self.interims_dropped += 1
+        self.transcription_ready.emit(text, source)
+
+    def _deliver(self, text, source):
+        self.interims_delivered += 1
+        self.transcription_ready.emit(text, source)
+
+    def _flush(self):
+        if not self._pending:
+            self._timer.stop()  # nothing arrived during the interval
+            return
+        pending, self._pending = self._pending, {}
+        for text, source in pending.values():
+            self._deliver(text, source)
+
+    def reset(self):
+        self._timer.stop()
+        self._pending.clear()
+
+    def summary(self):
+        return f"interims {self.interims_delivered} shown / {self.interims_dropped} coalesced"
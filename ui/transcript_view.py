@@ -0,0 +1,115 @@
+# transcript_view.py
+from PyQt5.QtWidgets import QPlainTextEdit
+from PyQt5.QtGui import QTextCursor
+
+
+class TranscriptView(QPlainTextEdit):
+    """Read-only live transcript that renders incrementally.
+
+    Each final is its own block; the current interim is the last block and
+    is replaced in place through a cursor, so an update only touches the
+    tail of the document however long the meeting gets. With
+    ``max_blocks`` > 0 the oldest blocks are dropped as new ones arrive
+    (the full transcript has to be kept elsewhere, e.g. for saving).
+    """
+
+    def __init__(self, max_blocks=0, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(max_blocks)
+        self._has_interim = False
+
+    def _tail_cursor(self):
+        """Cursor selecting the last block."""
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.movePosition(QTextCursor.StartOfBlock, QTextCursor.KeepAnchor)
+        return cursor
+
+    def _at_bottom(self):
+        bar = self.verticalScrollBar()
+        return bar.value() >= bar.maximum() - 4
+
+    def set_interim(self, text):
+        follow = self._at_bottom()
+        if self._has_interim:
+            self._tail_cursor().insertText(text)  # replaces only the interim span
+        else:
+            self.appendPlainText(text)
+            self._has_interim = True
+        if follow:
+            self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+
+    def add_final(self, text):
+        """Lock ``text`` in as a block; it takes the place of the interim."""
+        self.set_interim(text)
+        self._has_interim = False
+
+    def _take_interim(self):
+        if not self._has_interim:
+            return None
+        cursor = self._tail_cursor()
+        text = cursor.selectedText()
+        if cursor.blockNumber() > 0:
+            cursor.movePosition(QTextCursor.PreviousCharacter, QTextCursor.KeepAnchor)  # and its newline
+        cursor.removeSelectedText()
+        self._has_interim = False
+        return text
+
+    def append(self, text):
+        """Add a message line (QTextEdit-compatible); the interim stays last."""
+        interim = self._take_interim()
+        self.appendPlainText(text)
+        if interim is not None:
+            self.set_interim(interim)
+
+    def setPlainText(self, text):
+        self._has_interim = False
+        super().setPlainText(text)
+
+    def clear(self):
+        self._has_interim = False
+        super().clear()
+
+
+def _qt_len(text):
+    return len(text.encode("utf-16-le")) // 2  # Qt positions count UTF-16 units
+
+
+class InlineTail:
+    """A replaceable partial run at the end of a text edit's running text.
+
+    Streaming output is shown with :meth:`set_partial` (each call replaces
+    the previous partial) and locked in with :meth:`commit`. If something
+    else was written to the document meanwhile the stale partial is left
+    alone rather than cutting into the other text.
+    """
+
+    def __init__(self, edit, sep=" "):
+        self.edit = edit
+        self.sep = sep
+        self._len = 0  # length of the partial at the end of the document
+        self._end = None  # document length right after it was written
+
+    def _replace(self, text):
+        doc = self.edit.document()
+        cursor = QTextCursor(doc)
+        cursor.movePosition(QTextCursor.End)
+        if self._len and doc.characterCount() == self._end:
+            # logical position in UTF-16 units, the same units as _qt_len; Left would
+            # step by grapheme and in visual order (wrong for emoji, marks and RTL)
+            cursor.setPosition(cursor.position() - self._len, QTextCursor.KeepAnchor)
+        cursor.insertText(text)
+        self._len = _qt_len(text)
+        self._end = doc.characterCount()
+
+    def set_partial(self, text):
+        self._replace(self.sep + text)
+
+    def commit(self, text):
+        self._replace(self.sep + text)
+        self._len = 0
+
+    def discard(self):
+        self._replace("")
+        self._len = 0
@@ -8,6 +8,9 @@ import threading
 import subprocess
 import time
 from settings import SettingsManager,SettingsWindow,FeatureWindow1,FeatureWindow2,FeatureWindow3,FeatureWindow4,FeatureWindow5,FeatureWindow6,FeatureWindow7,FeatureWindow8
+from client_pool import client_pool
+from job_executor import job_executor
+from result_cache import result_cache
 
 CONFIG_FILE = "config/config.json"
 
@@ -33,6 +36,9 @@ class MainApp(QWidget):
         # Start FastAPI with delay
         self.start_fastapi_uvicorn_with_delay()
 
+        # Build and connect the shared cloud clients in the background
+        client_pool.prewarm()
+
         
 
         layout = QVBoxLayout()  # main layout (vertical)
@@ -257,6 +263,8 @@ class MainApp(QWidget):
 
     def closeEvent(self, event):
         self.save_window_geometry()
+        job_executor.shutdown()  # queued jobs are dropped, running ones told to stop
+        print(f"[MainApp] {result_cache.summary()}")
         if self.uvicorn_process:
             print("[MainApp] Terminating FastAPI uvicorn server...")
             self.uvicorn_process.terminate()